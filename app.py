@@ -1,568 +1,3047 @@
+import time
+
+INICIO_SCRIPT = time.perf_counter()
+
 import streamlit as st
 import sqlite3
+import argparse
+import csv
+import functools
+import glob
+import hashlib
+import html
+import importlib.util
+import io
+import itertools
+import json
+import mimetypes
 import os
-from datetime import datetime
-import pandas as pd
+import queue
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import urllib.parse
+import uuid
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from PIL import Image, ImageSequence, features
 
-st.set_page_config(
-    page_title="Pokedex",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+# O pandas (~0,4 s para importar) é carregado só nas funções e páginas que o usam
+FIM_IMPORTACOES = time.perf_counter()
 
-st.title("POKEDEX COMPLETA")
-st.subheader("Daniel Costa, Matheus Willian e Kauã Guedes 2°D")
-st.markdown("---")
+DB_PATH = 'pokedex.db'
+TAMANHO_POOL_LEITURA = 4
+MMAP_SIZE = 256 * 1024 * 1024
+BUSY_TIMEOUT_MS = 5000
+CACHE_MAX_ENTRADAS = 256
+TAMANHO_LOTE_IMPORTACAO = 5000
+MAX_REJEITADOS_RELATORIO = 1000
+LIMITE_BUSCA_APROXIMADA = 200
+PAGINAS = ["Página Inicial", "Gerenciar Treinadores", "Cadastrar Pokémon", "Visualizar Pokédex", "Estatísticas"]
+TAMANHO_LOTE_EXPORTACAO = 5000
+FORMATOS_EXPORTACAO = {"csv": "text/csv", "jsonl": "application/jsonl", "parquet": "application/vnd.apache.parquet"}
+UPLOADS_DIR = "uploads"
+STATIC_DIR = "static"
+MINIATURAS_DIR = os.path.join(STATIC_DIR, "miniaturas")
+OBJETOS_DIR = os.path.join(UPLOADS_DIR, "objetos")
+PENDENTES_DIR = os.path.join(UPLOADS_DIR, "pendentes")
+TAMANHO_BLOCO = 1024 * 1024
+PRAZO_COLETA_SEGUNDOS = 3600
+TAMANHO_MINIATURA = (320, 320)
+FORMATO_MINIATURA = "WEBP" if features.check("webp") else "PNG"
+CACHE_CONTROL_IMAGENS = "public, max-age=31536000, immutable"
+FORMATOS_IMAGEM_ACEITOS = {"PNG", "JPEG", "GIF", "WEBP"}
+TRABALHADORES_IMAGEM = 2
+LINHAS_EQUIPE = 6
+IMAGEM_PROCESSANDO = "processando"
+IMAGEM_PRONTA = "pronta"
+IMAGEM_ERRO = "erro"
+INSTRUMENTACAO_ATIVA = os.environ.get("POKEDEX_INSTRUMENTACAO") == "1"
+TRACE_ARQUIVO = os.environ.get("POKEDEX_TRACE_ARQUIVO")
+MAX_EXECUCOES_TRACE = 200
+MAX_LOG_ALTERACOES = 10000
+LIMITE_ALTERACOES_POR_CONSULTA = 500
+INTERVALO_ATUALIZACAO_SEGUNDOS = 5
+MAX_NOVOS_EXIBIDOS = 30
+BACKEND_FRAMES = "pyarrow" if importlib.util.find_spec("pyarrow") else "numpy_nullable"
+
+class Instrumentacao:
+    """Acumula contagens e tempos de SQL, E/S de imagens e execuções de cada página
+
+    Os eventos da execução atual ficam por thread, já que cada rerun do
+    Streamlit roda inteiro em uma única thread.
+    """
+
+    def __init__(self, trace_arquivo=None):
+        self.trace_arquivo = trace_arquivo
+        self.execucoes = deque(maxlen=MAX_EXECUCOES_TRACE)
+        self._totais = {}
+        self._trava = threading.Lock()
+        self._local = threading.local()
+
+    def registrar(self, categoria, rotulo, segundos):
+        with self._trava:
+            total = self._totais.setdefault((categoria, rotulo), [0, 0.0])
+            total[0] += 1
+            total[1] += segundos
+        eventos = getattr(self._local, "eventos", None)
+        if eventos is not None:
+            eventos.append({'categoria': categoria, 'rotulo': rotulo, 'ms': round(segundos * 1000, 3)})
+
+    @contextmanager
+    def medir(self, categoria, rotulo):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(categoria, rotulo, time.perf_counter() - inicio)
+
+    def iniciar_execucao(self, inicio=None):
+        self._local.eventos = []
+        self._local.inicio = time.perf_counter() if inicio is None else inicio
+
+    def finalizar_execucao(self, pagina):
+        """Encerra a execução atual, registra o tempo total da página e retorna o seu trace"""
+        eventos = getattr(self._local, "eventos", None)
+        if eventos is None:
+            return None
+        segundos = time.perf_counter() - self._local.inicio
+        self._local.eventos = None
+        self.registrar("pagina", pagina, segundos)
+
+        execucao = {
+            'timestamp': time.time(),
+            'pagina': pagina,
+            'ms': round(segundos * 1000, 3),
+            'eventos': eventos
+        }
+        self.execucoes.append(execucao)
+        if self.trace_arquivo:
+            with self._trava, open(self.trace_arquivo, "a", encoding="utf-8") as arquivo:
+                arquivo.write(json.dumps(execucao, ensure_ascii=False) + "\n")
+        return execucao
+
+    def totais(self):
+        """Retorna [(categoria, rotulo, contagem, segundos)] ordenado pelo tempo acumulado"""
+        with self._trava:
+            linhas = [(c, r, n, s) for (c, r), (n, s) in self._totais.items()]
+        return sorted(linhas, key=lambda linha: linha[3], reverse=True)
+
+    def texto_prometheus(self):
+        """Exporta os totais no formato de texto do Prometheus"""
+        def rotulos(categoria, rotulo):
+            escapado = rotulo.replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+            return f'{{categoria="{categoria}",rotulo="{escapado}"}}'
+
+        linhas = [
+            "# HELP pokedex_operacoes_total Operações instrumentadas executadas",
+            "# TYPE pokedex_operacoes_total counter",
+        ]
+        totais = self.totais()
+        linhas += [f"pokedex_operacoes_total{rotulos(c, r)} {n}" for c, r, n, _ in totais]
+        linhas += [
+            "# HELP pokedex_operacoes_segundos_total Tempo acumulado das operações instrumentadas",
+            "# TYPE pokedex_operacoes_segundos_total counter",
+        ]
+        linhas += [f"pokedex_operacoes_segundos_total{rotulos(c, r)} {s:.6f}" for c, r, _, s in totais]
+        return "\n".join(linhas) + "\n"
+
+    def trace_jsonl(self):
+        return "".join(json.dumps(execucao, ensure_ascii=False) + "\n" for execucao in list(self.execucoes))
+
+@st.cache_resource
+def get_instrumentacao():
+    """Retorna o coletor de instrumentação do processo"""
+    return Instrumentacao(TRACE_ARQUIVO)
+
+def medir(categoria, rotulo):
+    """Context manager que cronometra uma operação quando a instrumentação está ativa"""
+    if not INSTRUMENTACAO_ATIVA:
+        return nullcontext()
+    return get_instrumentacao().medir(categoria, rotulo)
+
+def _rotulo_sql(sql):
+    return " ".join(sql.split())[:160]
+
+class CursorInstrumentado(sqlite3.Cursor):
+    """Cursor que cronometra cada comando SQL e a leitura dos seus resultados"""
+
+    _rotulo = ""
+
+    def execute(self, sql, parametros=()):
+        self._rotulo = _rotulo_sql(sql)
+        with medir("sql", self._rotulo):
+            return super().execute(sql, parametros)
+
+    def executemany(self, sql, parametros):
+        self._rotulo = _rotulo_sql(sql)
+        with medir("sql", self._rotulo):
+            return super().executemany(sql, parametros)
+
+    def fetchone(self):
+        with medir("sql_leitura", self._rotulo):
+            return super().fetchone()
+
+    def fetchmany(self, *args, **kwargs):
+        with medir("sql_leitura", self._rotulo):
+            return super().fetchmany(*args, **kwargs)
+
+    def fetchall(self):
+        with medir("sql_leitura", self._rotulo):
+            return super().fetchall()
+
+class ConexaoInstrumentada(sqlite3.Connection):
+    """Conexão cujos cursores, inclusive os de `execute`, são instrumentados"""
+
+    def cursor(self, factory=CursorInstrumentado):
+        return super().cursor(factory)
+
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, parametros):
+        return self.cursor().executemany(sql, parametros)
+
+class PoolConexoes:
+    """Conexões SQLite de longa duração compartilhadas entre as threads do Streamlit
+
+    Leitores pegam uma conexão livre do pool; escritas passam pela única
+    conexão de escrita, protegida por uma trava. Em modo WAL os leitores
+    não esperam pelo escritor.
+    """
+
+    def __init__(self, caminho, tamanho_leitura=TAMANHO_POOL_LEITURA):
+        self.caminho = caminho
+        self.versao = 0
+        self.ultima_alteracao = 0
+        self._escritor = self._conectar()
+        self._trava_escrita = threading.Lock()
+        self._leitores = queue.LifoQueue()
+        for _ in range(tamanho_leitura):
+            self._leitores.put(self._conectar())
+
+    def _conectar(self):
+        conn = sqlite3.connect(
+            self.caminho,
+            check_same_thread=False,
+            cached_statements=256,
+            factory=ConexaoInstrumentada if INSTRUMENTACAO_ATIVA else sqlite3.Connection
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        return conn
+
+    @contextmanager
+    def leitura(self):
+        """Empresta uma conexão de leitura e a devolve ao pool ao final"""
+        conn = self._leitores.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._leitores.put(conn)
+
+    @contextmanager
+    def escrita(self):
+        """Entrega a conexão de escrita e faz commit (ou rollback em caso de erro)
+
+        Cada escrita confirmada incrementa `versao`, invalidando as leituras em cache.
+        """
+        with self._trava_escrita:
+            try:
+                yield self._escritor
+                self._escritor.commit()
+            except BaseException:
+                self._escritor.rollback()
+                raise
+            finally:
+                self.versao += 1
+
+@st.cache_resource
+def get_pool():
+    """Retorna o pool de conexões do processo"""
+    return PoolConexoes(DB_PATH)
+
+def conexao_leitura():
+    """Context manager com uma conexão de leitura do pool"""
+    return get_pool().leitura()
+
+def conexao_escrita():
+    """Context manager com a conexão de escrita do pool"""
+    return get_pool().escrita()
+
+def ler_frame(conn, sql, params=(), categorias=()):
+    """Lê uma consulta em um DataFrame colunar (Arrow, se o pyarrow estiver instalado)
+
+    As colunas em `categorias` viram categóricas: cada tipo ou treinador é
+    guardado uma vez e as linhas só carregam o código inteiro.
+    """
+    import pandas as pd
+
+    frame = pd.read_sql(sql, conn, params=params, dtype_backend=BACKEND_FRAMES)
+    return frame.astype({coluna: "category" for coluna in categorias})
+
+def versao_dados():
+    """Retorna o contador de versão dos dados, incrementado a cada escrita"""
+    return get_pool().versao
+
+def registrar_alteracao_vista(alteracao_id):
+    """Invalida as leituras em cache quando o log mostra escritas ainda não vistas pelo processo
+
+    Cobre escritas feitas por outros processos (como a importação pela linha
+    de comando), que não passam pelo contador `versao` deste pool.
+    """
+    pool = get_pool()
+    if alteracao_id > pool.ultima_alteracao:
+        pool.ultima_alteracao = alteracao_id
+        pool.versao += 1
+
+def cache_por_versao(func):
+    """Cacheia uma função de leitura até a próxima escrita no banco
+
+    O resultado fica em `st.cache_data`, compartilhado entre as sessões,
+    com a versão dos dados como parte da chave.
+    """
+    def _consultar(versao, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    # st.cache_data identifica a função pelo nome qualificado
+    _consultar.__qualname__ = f"{func.__qualname__}__cache"
+    _consultar = st.cache_data(max_entries=CACHE_MAX_ENTRADAS, show_spinner=False)(_consultar)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return _consultar(versao_dados(), *args, **kwargs)
+
+    return wrapper
 
 def init_database():
     """Inicializa o banco de dados SQLite com as tabelas necessárias"""
-    conn = sqlite3.connect('pokedex.db')
+    with conexao_escrita() as conn:
+        _criar_tabelas(conn)
+
+def _criar_tabelas(conn):
+    """Cria as tabelas e aplica as migrações pendentes"""
+    cursor = conn.cursor()
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS treinadores (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            cidade TEXT NOT NULL,
+            data_cadastro TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS pokemons (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            tipo1 TEXT NOT NULL,
+            tipo2 TEXT,
+            treinador_id INTEGER NOT NULL,
+            imagem_path TEXT,
+            data_cadastro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (treinador_id) REFERENCES treinadores (id)
+        )
+    ''')
+    
+    conn.commit()
+    aplicar_migracoes(conn)
+
+def _migracao_indices_pokemons(cursor):
+    """Cria os índices usados pelo JOIN com treinadores, ordenação e filtros de tipo"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_pokemons_treinador_id ON pokemons(treinador_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_pokemons_nome ON pokemons(nome)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_pokemons_tipo1 ON pokemons(tipo1)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_pokemons_tipo2 ON pokemons(tipo2)")
+
+def _migracao_imagens_por_conteudo(cursor):
+    """Copia as imagens antigas para o armazenamento endereçado por conteúdo
+
+    Os arquivos originais deixam de ser referenciados e são removidos por
+    `coletar_imagens_orfas`.
+    """
+    cursor.execute("SELECT DISTINCT imagem_path FROM pokemons WHERE imagem_path IS NOT NULL")
+    for (antigo,) in cursor.fetchall():
+        if antigo.startswith(OBJETOS_DIR) or not os.path.exists(antigo):
+            continue
+        with open(antigo, "rb") as arquivo:
+            novo = armazenar_conteudo(arquivo, antigo)
+        cursor.execute("UPDATE pokemons SET imagem_path = ? WHERE imagem_path = ?", (novo, antigo))
+
+def _sql_ajuste_estatisticas(registro, delta):
+    """Comandos de trigger que somam `delta` às estatísticas do Pokémon NEW ou OLD"""
+    return f"""
+        UPDATE estatisticas_treinadores
+        SET total_pokemons = total_pokemons + ({delta})
+        WHERE treinador_id = {registro}.treinador_id;
+        INSERT INTO estatisticas_tipos (tipo, total) VALUES ({registro}.tipo1, {delta})
+        ON CONFLICT (tipo) DO UPDATE SET total = total + ({delta});
+        INSERT INTO estatisticas_tipos (tipo, total)
+        SELECT {registro}.tipo2, {delta} WHERE {registro}.tipo2 IS NOT NULL
+        ON CONFLICT (tipo) DO UPDATE SET total = total + ({delta});
+        UPDATE estatisticas_gerais
+        SET total_pokemons = total_pokemons + ({delta}),
+            com_dois_tipos = com_dois_tipos + ({delta}) * ({registro}.tipo2 IS NOT NULL);
+    """
+
+def _migracao_estatisticas_materializadas(cursor):
+    """Cria as tabelas de estatísticas mantidas por triggers e as preenche com os dados atuais"""
+    cursor.execute('''
+        CREATE TABLE estatisticas_gerais (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total_treinadores INTEGER NOT NULL,
+            total_pokemons INTEGER NOT NULL,
+            com_dois_tipos INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE estatisticas_treinadores (
+            treinador_id INTEGER PRIMARY KEY REFERENCES treinadores (id),
+            total_pokemons INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE estatisticas_tipos (
+            tipo TEXT PRIMARY KEY,
+            total INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute(
+        "CREATE INDEX idx_estatisticas_treinadores_total "
+        "ON estatisticas_treinadores(total_pokemons DESC)"
+    )
+
+    cursor.execute('''
+        INSERT INTO estatisticas_gerais
+        SELECT 1,
+               (SELECT COUNT(*) FROM treinadores),
+               (SELECT COUNT(*) FROM pokemons),
+               (SELECT COUNT(tipo2) FROM pokemons)
+    ''')
+    cursor.execute('''
+        INSERT INTO estatisticas_treinadores
+        SELECT t.id, COUNT(p.id)
+        FROM treinadores t
+        LEFT JOIN pokemons p ON t.id = p.treinador_id
+        GROUP BY t.id
+    ''')
+    cursor.execute('''
+        INSERT INTO estatisticas_tipos
+        SELECT tipo, COUNT(*)
+        FROM (SELECT tipo1 AS tipo FROM pokemons
+              UNION ALL
+              SELECT tipo2 FROM pokemons WHERE tipo2 IS NOT NULL)
+        GROUP BY tipo
+    ''')
+
+    cursor.execute('''
+        CREATE TRIGGER trg_treinadores_estatisticas_insert AFTER INSERT ON treinadores
+        BEGIN
+            INSERT INTO estatisticas_treinadores (treinador_id, total_pokemons) VALUES (NEW.id, 0);
+            UPDATE estatisticas_gerais SET total_treinadores = total_treinadores + 1;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER trg_treinadores_estatisticas_delete AFTER DELETE ON treinadores
+        BEGIN
+            DELETE FROM estatisticas_treinadores WHERE treinador_id = OLD.id;
+            UPDATE estatisticas_gerais SET total_treinadores = total_treinadores - 1;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_pokemons_estatisticas_insert AFTER INSERT ON pokemons
+        BEGIN
+            {_sql_ajuste_estatisticas("NEW", 1)}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_pokemons_estatisticas_delete AFTER DELETE ON pokemons
+        BEGIN
+            {_sql_ajuste_estatisticas("OLD", -1)}
+            DELETE FROM estatisticas_tipos WHERE total <= 0;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_pokemons_estatisticas_update
+        AFTER UPDATE OF tipo1, tipo2, treinador_id ON pokemons
+        BEGIN
+            {_sql_ajuste_estatisticas("OLD", -1)}
+            {_sql_ajuste_estatisticas("NEW", 1)}
+            DELETE FROM estatisticas_tipos WHERE total <= 0;
+        END
+    ''')
+
+def _sql_indexar_busca(registro):
+    """Comandos de trigger que indexam o Pokémon NEW ou OLD nas tabelas de busca"""
+    return f"""
+        INSERT INTO busca_pokemons (rowid, nome, tipo1, tipo2, treinador_nome, treinador_cidade)
+        SELECT {registro}.id, {registro}.nome, {registro}.tipo1, {registro}.tipo2, t.nome, t.cidade
+        FROM treinadores t WHERE t.id = {registro}.treinador_id;
+        INSERT INTO busca_pokemons_trigram (rowid, nome) VALUES ({registro}.id, {registro}.nome);
+    """
+
+def _migracao_busca_textual(cursor):
+    """Cria os índices FTS5 de busca (palavras sem acento e trigramas) e os triggers de sincronização"""
+    cursor.execute('''
+        CREATE VIRTUAL TABLE busca_pokemons USING fts5(
+            nome, tipo1, tipo2, treinador_nome, treinador_cidade,
+            tokenize = "unicode61 remove_diacritics 2",
+            prefix = '2 3'
+        )
+    ''')
+    cursor.execute('''
+        CREATE VIRTUAL TABLE busca_pokemons_trigram USING fts5(
+            nome,
+            tokenize = "trigram"
+        )
+    ''')
+
+    cursor.execute('''
+        INSERT INTO busca_pokemons (rowid, nome, tipo1, tipo2, treinador_nome, treinador_cidade)
+        SELECT p.id, p.nome, p.tipo1, p.tipo2, t.nome, t.cidade
+        FROM pokemons p
+        JOIN treinadores t ON p.treinador_id = t.id
+    ''')
+    cursor.execute("INSERT INTO busca_pokemons_trigram (rowid, nome) SELECT id, nome FROM pokemons")
+
+    cursor.execute(f'''
+        CREATE TRIGGER trg_pokemons_busca_insert AFTER INSERT ON pokemons
+        BEGIN
+            {_sql_indexar_busca("NEW")}
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER trg_pokemons_busca_delete AFTER DELETE ON pokemons
+        BEGIN
+            DELETE FROM busca_pokemons WHERE rowid = OLD.id;
+            DELETE FROM busca_pokemons_trigram WHERE rowid = OLD.id;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_pokemons_busca_update
+        AFTER UPDATE OF nome, tipo1, tipo2, treinador_id ON pokemons
+        BEGIN
+            DELETE FROM busca_pokemons WHERE rowid = OLD.id;
+            DELETE FROM busca_pokemons_trigram WHERE rowid = OLD.id;
+            {_sql_indexar_busca("NEW")}
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER trg_treinadores_busca_update AFTER UPDATE OF nome, cidade ON treinadores
+        BEGIN
+            UPDATE busca_pokemons
+            SET treinador_nome = NEW.nome, treinador_cidade = NEW.cidade
+            WHERE rowid IN (SELECT id FROM pokemons WHERE treinador_id = NEW.id);
+        END
+    ''')
+
+def _migracao_status_imagem(cursor):
+    """Adiciona o estado de processamento da imagem de cada Pokémon"""
+    cursor.execute(f"ALTER TABLE pokemons ADD COLUMN imagem_status TEXT NOT NULL DEFAULT '{IMAGEM_PRONTA}'")
+
+def _sql_ajuste_estatisticas_tipos(registro, delta):
+    """Como `_sql_ajuste_estatisticas`, mas com os tipos codificados pelo id do catálogo"""
+    return f"""
+        UPDATE estatisticas_treinadores
+        SET total_pokemons = total_pokemons + ({delta})
+        WHERE treinador_id = {registro}.treinador_id;
+        INSERT INTO estatisticas_tipos (tipo_id, total) VALUES ({registro}.tipo1_id, {delta})
+        ON CONFLICT (tipo_id) DO UPDATE SET total = total + ({delta});
+        INSERT INTO estatisticas_tipos (tipo_id, total)
+        SELECT {registro}.tipo2_id, {delta} WHERE {registro}.tipo2_id IS NOT NULL
+        ON CONFLICT (tipo_id) DO UPDATE SET total = total + ({delta});
+        UPDATE estatisticas_gerais
+        SET total_pokemons = total_pokemons + ({delta}),
+            com_dois_tipos = com_dois_tipos + ({delta}) * ({registro}.tipo2_id IS NOT NULL);
+    """
+
+def _sql_indexar_busca_tipos(registro):
+    """Como `_sql_indexar_busca`, mas buscando o nome dos tipos no catálogo"""
+    return f"""
+        INSERT INTO busca_pokemons (rowid, nome, tipo1, tipo2, treinador_nome, treinador_cidade)
+        SELECT {registro}.id, {registro}.nome,
+               (SELECT nome FROM tipos WHERE id = {registro}.tipo1_id),
+               (SELECT nome FROM tipos WHERE id = {registro}.tipo2_id),
+               t.nome, t.cidade
+        FROM treinadores t WHERE t.id = {registro}.treinador_id;
+        INSERT INTO busca_pokemons_trigram (rowid, nome) VALUES ({registro}.id, {registro}.nome);
+    """
+
+def _migracao_catalogo_tipos(cursor):
+    """Cria o catálogo `tipos` e troca tipo1/tipo2 (texto) por chaves inteiras
+
+    A tabela pokemons é reconstruída, pois o SQLite não adiciona colunas
+    NOT NULL com chave estrangeira; os triggers de estatísticas e de busca
+    são recriados sobre as novas colunas.
+    """
+    cursor.execute('''
+        CREATE TABLE tipos (
+            id INTEGER PRIMARY KEY,
+            nome TEXT NOT NULL UNIQUE
+        )
+    ''')
+    cursor.execute('''
+        INSERT INTO tipos (nome)
+        SELECT tipo1 FROM pokemons
+        UNION
+        SELECT tipo2 FROM pokemons WHERE tipo2 IS NOT NULL
+    ''')
+
+    for trigger in (
+        "trg_pokemons_estatisticas_insert", "trg_pokemons_estatisticas_delete",
+        "trg_pokemons_estatisticas_update", "trg_pokemons_busca_insert",
+        "trg_pokemons_busca_delete", "trg_pokemons_busca_update",
+        "trg_treinadores_busca_update",
+    ):
+        cursor.execute(f"DROP TRIGGER {trigger}")
+
+    cursor.execute(f'''
+        CREATE TABLE pokemons_nova (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            tipo1_id INTEGER NOT NULL,
+            tipo2_id INTEGER,
+            treinador_id INTEGER NOT NULL,
+            imagem_path TEXT,
+            data_cadastro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            imagem_status TEXT NOT NULL DEFAULT '{IMAGEM_PRONTA}',
+            FOREIGN KEY (tipo1_id) REFERENCES tipos (id),
+            FOREIGN KEY (tipo2_id) REFERENCES tipos (id),
+            FOREIGN KEY (treinador_id) REFERENCES treinadores (id)
+        )
+    ''')
+    cursor.execute('''
+        INSERT INTO pokemons_nova
+            (id, nome, tipo1_id, tipo2_id, treinador_id, imagem_path, data_cadastro, imagem_status)
+        SELECT p.id, p.nome, t1.id, t2.id, p.treinador_id, p.imagem_path, p.data_cadastro, p.imagem_status
+        FROM pokemons p
+        JOIN tipos t1 ON t1.nome = p.tipo1
+        LEFT JOIN tipos t2 ON t2.nome = p.tipo2
+    ''')
+    # Preserva o contador do AUTOINCREMENT para não reutilizar ids apagados
+    cursor.execute("DELETE FROM sqlite_sequence WHERE name = 'pokemons_nova'")
+    cursor.execute("UPDATE sqlite_sequence SET name = 'pokemons_nova' WHERE name = 'pokemons'")
+    cursor.execute("DROP TABLE pokemons")
+    cursor.execute("ALTER TABLE pokemons_nova RENAME TO pokemons")
+
+    cursor.execute("CREATE INDEX idx_pokemons_treinador_id ON pokemons(treinador_id)")
+    cursor.execute("CREATE INDEX idx_pokemons_nome ON pokemons(nome)")
+    cursor.execute("CREATE INDEX idx_pokemons_tipo1_id ON pokemons(tipo1_id)")
+    cursor.execute("CREATE INDEX idx_pokemons_tipo2_id ON pokemons(tipo2_id)")
+
+    cursor.execute("DROP TABLE estatisticas_tipos")
+    cursor.execute('''
+        CREATE TABLE estatisticas_tipos (
+            tipo_id INTEGER PRIMARY KEY REFERENCES tipos (id),
+            total INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        INSERT INTO estatisticas_tipos
+        SELECT tipo_id, COUNT(*)
+        FROM (SELECT tipo1_id AS tipo_id FROM pokemons
+              UNION ALL
+              SELECT tipo2_id FROM pokemons WHERE tipo2_id IS NOT NULL)
+        GROUP BY tipo_id
+    ''')
+
+    cursor.execute(f'''
+        CREATE TRIGGER trg_pokemons_estatisticas_insert AFTER INSERT ON pokemons
+        BEGIN
+            {_sql_ajuste_estatisticas_tipos("NEW", 1)}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_pokemons_estatisticas_delete AFTER DELETE ON pokemons
+        BEGIN
+            {_sql_ajuste_estatisticas_tipos("OLD", -1)}
+            DELETE FROM estatisticas_tipos WHERE total <= 0;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_pokemons_estatisticas_update
+        AFTER UPDATE OF tipo1_id, tipo2_id, treinador_id ON pokemons
+        BEGIN
+            {_sql_ajuste_estatisticas_tipos("OLD", -1)}
+            {_sql_ajuste_estatisticas_tipos("NEW", 1)}
+            DELETE FROM estatisticas_tipos WHERE total <= 0;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_pokemons_busca_insert AFTER INSERT ON pokemons
+        BEGIN
+            {_sql_indexar_busca_tipos("NEW")}
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER trg_pokemons_busca_delete AFTER DELETE ON pokemons
+        BEGIN
+            DELETE FROM busca_pokemons WHERE rowid = OLD.id;
+            DELETE FROM busca_pokemons_trigram WHERE rowid = OLD.id;
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_pokemons_busca_update
+        AFTER UPDATE OF nome, tipo1_id, tipo2_id, treinador_id ON pokemons
+        BEGIN
+            DELETE FROM busca_pokemons WHERE rowid = OLD.id;
+            DELETE FROM busca_pokemons_trigram WHERE rowid = OLD.id;
+            {_sql_indexar_busca_tipos("NEW")}
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER trg_treinadores_busca_update AFTER UPDATE OF nome, cidade ON treinadores
+        BEGIN
+            UPDATE busca_pokemons
+            SET treinador_nome = NEW.nome, treinador_cidade = NEW.cidade
+            WHERE rowid IN (SELECT id FROM pokemons WHERE treinador_id = NEW.id);
+        END
+    ''')
+
+def _migracao_log_alteracoes(cursor):
+    """Cria o log de alterações de pokemons e treinadores, usado na atualização ao vivo das páginas
+
+    Guarda só as MAX_LOG_ALTERACOES alterações mais recentes.
+    """
+    cursor.execute('''
+        CREATE TABLE log_alteracoes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tabela TEXT NOT NULL,
+            registro_id INTEGER NOT NULL,
+            operacao TEXT NOT NULL,
+            data TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    for tabela in ("pokemons", "treinadores"):
+        for evento, registro in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+            cursor.execute(f'''
+                CREATE TRIGGER trg_{tabela}_log_{evento.lower()} AFTER {evento} ON {tabela}
+                BEGIN
+                    INSERT INTO log_alteracoes (tabela, registro_id, operacao)
+                    VALUES ('{tabela}', {registro}.id, '{evento.lower()}');
+                END
+            ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_log_alteracoes_limite AFTER INSERT ON log_alteracoes
+        BEGIN
+            DELETE FROM log_alteracoes WHERE id <= NEW.id - {MAX_LOG_ALTERACOES};
+        END
+    ''')
+
+def _migracao_indices_treinadores(cursor):
+    """Cria os índices da página de treinador e do ranking paginado
+
+    (treinador_id, nome) entrega os Pokémon do treinador já ordenados e
+    substitui o índice só de treinador_id. O índice crescente de total,
+    percorrido de trás para frente, ordena o ranking por (total, id) sem
+    ordenação extra.
+    """
+    cursor.execute("CREATE INDEX idx_pokemons_treinador_nome ON pokemons(treinador_id, nome)")
+    cursor.execute("DROP INDEX idx_pokemons_treinador_id")
+    cursor.execute("CREATE INDEX idx_estatisticas_treinadores_ranking ON estatisticas_treinadores(total_pokemons)")
+    cursor.execute("DROP INDEX idx_estatisticas_treinadores_total")
+
+def _migracao_imagens_pendentes(cursor):
+    """Cria o índice parcial dos Pokémon com imagem em processamento, lido a cada inicialização"""
+    cursor.execute(
+        f"CREATE INDEX idx_pokemons_processando ON pokemons(id) WHERE imagem_status = '{IMAGEM_PROCESSANDO}'"
+    )
+
+# Migrações em ordem; a posição na lista (a partir de 1) é a versão gravada em PRAGMA user_version
+MIGRACOES = [
+    _migracao_indices_pokemons,
+    _migracao_imagens_por_conteudo,
+    _migracao_estatisticas_materializadas,
+    _migracao_busca_textual,
+    _migracao_status_imagem,
+    _migracao_catalogo_tipos,
+    _migracao_log_alteracoes,
+    _migracao_indices_treinadores,
+    _migracao_imagens_pendentes,
+]
+
+def aplicar_migracoes(conn):
+    """Aplica as migrações pendentes, cada uma na sua própria transação"""
     cursor = conn.cursor()
+    versao_atual = cursor.execute("PRAGMA user_version").fetchone()[0]
+
+    for versao, migracao in enumerate(MIGRACOES, start=1):
+        if versao <= versao_atual:
+            continue
+        try:
+            cursor.execute("BEGIN")
+            migracao(cursor)
+            cursor.execute(f"PRAGMA user_version = {versao}")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+
+def create_upload_folder():
+    """Cria o diretório para armazenar as imagens"""
+    if not os.path.exists(UPLOADS_DIR):
+        os.makedirs(UPLOADS_DIR)
+    os.makedirs(MINIATURAS_DIR, exist_ok=True)
+    os.makedirs(OBJETOS_DIR, exist_ok=True)
+    os.makedirs(PENDENTES_DIR, exist_ok=True)
+
+@cache_por_versao
+def get_all_treinadores():
+    """Retorna todos os treinadores cadastrados"""
+    with conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, nome, cidade FROM treinadores ORDER BY nome")
+        treinadores = cursor.fetchall()
+    return treinadores
+
+def get_treinadores_dict():
+    """Retorna dicionário de treinadores para selectbox"""
+    treinadores = get_all_treinadores()
+    return {f"{t[1]} - {t[2]}": t[0] for t in treinadores}
+
+def insert_treinador(nome, cidade):
+    """Insere um novo treinador no banco"""
+    try:
+        with conexao_escrita() as conn:
+            conn.execute(
+                "INSERT INTO treinadores (nome, cidade) VALUES (?, ?)",
+                (nome, cidade)
+            )
+        return True, "Treinador cadastrado com sucesso!"
+    except sqlite3.Error as e:
+        return False, f"Erro ao cadastrar treinador: {e}"
+
+def _hash_stream(arquivo):
+    """Calcula o SHA-256 de um arquivo binário lendo em blocos"""
+    sha = hashlib.sha256()
+    for bloco in iter(lambda: arquivo.read(TAMANHO_BLOCO), b""):
+        sha.update(bloco)
+    return sha.hexdigest()
+
+def caminho_objeto(sha, extensao):
+    """Retorna o caminho do objeto de imagem, distribuído em subpastas pelo hash"""
+    return os.path.join(OBJETOS_DIR, sha[:2], sha[2:4], f"{sha}{extensao}")
+
+def _extensao_normalizada(nome):
+    extensao = os.path.splitext(nome)[1].lower()
+    return ".jpg" if extensao == ".jpeg" else extensao
+
+def armazenar_conteudo(arquivo, nome):
+    """Grava o conteúdo do arquivo no armazenamento por hash e retorna o caminho
+
+    Conteúdos repetidos reaproveitam o objeto já existente, sem nova escrita.
+    """
+    arquivo.seek(0)
+    caminho = caminho_objeto(_hash_stream(arquivo), _extensao_normalizada(nome))
+
+    if os.path.exists(caminho):
+        # Renova o prazo para a coleta de órfãos não remover o objeto antes do INSERT
+        os.utime(caminho)
+        return caminho
+
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f"{caminho}.{uuid.uuid4().hex}.tmp"
+    arquivo.seek(0)
+    try:
+        with open(temporario, "wb") as destino:
+            for bloco in iter(lambda: arquivo.read(TAMANHO_BLOCO), b""):
+                destino.write(bloco)
+            destino.flush()
+            os.fsync(destino.fileno())
+        os.replace(temporario, caminho)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+    return caminho
+
+def salvar_imagem(uploaded_file):
+    """Salva a imagem no armazenamento por conteúdo e retorna o caminho"""
+    if uploaded_file is not None:
+        with medir("imagem", "salvar_imagem"):
+            return armazenar_conteudo(uploaded_file, uploaded_file.name)
+    return None
+
+def coletar_imagens_orfas(prazo_segundos=PRAZO_COLETA_SEGUNDOS):
+    """Remove as imagens de UPLOADS_DIR que nenhum Pokémon referencia e retorna quantas foram removidas
+
+    Inclui os arquivos antigos já copiados para o armazenamento por conteúdo.
+    Arquivos modificados há menos de `prazo_segundos` são mantidos, pois
+    podem pertencer a um cadastro em andamento.
+    """
+    with conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT imagem_path FROM pokemons WHERE imagem_path IS NOT NULL")
+        referenciados = {os.path.normpath(row[0]) for row in cursor.fetchall()}
+
+    limite = time.time() - prazo_segundos
+    removidos = 0
+    for raiz, diretorios, arquivos in os.walk(UPLOADS_DIR):
+        if raiz == UPLOADS_DIR and os.path.basename(PENDENTES_DIR) in diretorios:
+            # Envios ainda não processados são tratados por retomar_imagens_pendentes
+            diretorios.remove(os.path.basename(PENDENTES_DIR))
+        for nome in arquivos:
+            caminho = os.path.join(raiz, nome)
+            if os.path.normpath(caminho) in referenciados or os.path.getmtime(caminho) > limite:
+                continue
+            # A miniatura é do conteúdo: só sai junto com o objeto, não com a cópia antiga
+            e_objeto = raiz.startswith(OBJETOS_DIR + os.sep) and not nome.endswith(".tmp")
+            miniatura = caminho_miniatura(caminho) if e_objeto else None
+            os.remove(caminho)
+            removidos += 1
+            if miniatura and os.path.exists(miniatura):
+                os.remove(miniatura)
+    return removidos
+
+@st.cache_resource
+def _imagens_confirmadas():
+    """Conjunto, por processo, dos caminhos de imagem já encontrados em disco"""
+    return set()
+
+def imagem_disponivel(imagem_path):
+    """Verifica se a imagem existe, consultando o disco só para caminhos ainda não vistos"""
+    if not imagem_path:
+        return False
+    confirmadas = _imagens_confirmadas()
+    if imagem_path in confirmadas:
+        return True
+    with medir("imagem", "os.path.exists"):
+        existe = os.path.exists(imagem_path)
+    if existe:
+        confirmadas.add(imagem_path)
+        return True
+    return False
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRADAS, show_spinner=False)
+def _hash_arquivo(caminho, mtime_ns, tamanho):
+    """Calcula o SHA-256 do arquivo; mtime e tamanho invalidam a entrada em cache"""
+    with open(caminho, "rb") as arquivo:
+        return _hash_stream(arquivo)
+
+def _chave_conteudo(imagem_path):
+    """Retorna o SHA-256 da imagem, lido do nome quando ela já está no armazenamento por hash"""
+    if imagem_path.startswith(OBJETOS_DIR + os.sep):
+        return os.path.splitext(os.path.basename(imagem_path))[0]
+    info = os.stat(imagem_path)
+    return _hash_arquivo(imagem_path, info.st_mtime_ns, info.st_size)
+
+def caminho_miniatura(imagem_path):
+    """Retorna o caminho da miniatura derivada do conteúdo da imagem"""
+    chave = _chave_conteudo(imagem_path)
+    largura, altura = TAMANHO_MINIATURA
+    extensao = FORMATO_MINIATURA.lower()
+    return os.path.join(MINIATURAS_DIR, f"{chave}_{largura}x{altura}.{extensao}")
+
+def gerar_miniatura(imagem_path):
+    """Gera (ou reaproveita) a miniatura da imagem e retorna o seu caminho
+
+    GIFs animados usam apenas o primeiro quadro. Retorna None se a imagem
+    não puder ser lida.
+    """
+    with medir("imagem", "gerar_miniatura"):
+        return _gerar_miniatura(imagem_path)
+
+def _gerar_miniatura(imagem_path):
+    try:
+        destino = caminho_miniatura(imagem_path)
+        if imagem_disponivel(destino):
+            return destino
+
+        with Image.open(imagem_path) as imagem:
+            quadro = next(ImageSequence.Iterator(imagem)).convert("RGBA")
+        quadro.thumbnail(TAMANHO_MINIATURA)
+
+        os.makedirs(MINIATURAS_DIR, exist_ok=True)
+        temporario = f"{destino}.{threading.get_ident()}.tmp"
+        quadro.save(temporario, FORMATO_MINIATURA)
+        os.replace(temporario, destino)
+        return destino
+    except (OSError, ValueError):
+        return None
+
+def url_estatica(caminho):
+    """Converte um caminho dentro de STATIC_DIR na URL servida pelo Streamlit"""
+    relativo = os.path.relpath(caminho, STATIC_DIR).replace(os.sep, "/")
+    return f"app/static/{relativo}"
+
+class ArmazenamentoLocal:
+    """Publica as imagens pelo static serving do Streamlit
+
+    Só arquivos dentro de STATIC_DIR têm URL. O Streamlit não envia
+    Cache-Control para eles; como os nomes derivam do conteúdo, um proxy ou
+    CDN na frente de /app/static pode servi-los com CACHE_CONTROL_IMAGENS.
+    """
+
+    def url(self, caminho):
+        """Retorna a URL do arquivo, ou None se ele estiver fora de STATIC_DIR"""
+        raiz = os.path.abspath(STATIC_DIR)
+        if os.path.commonpath([os.path.abspath(caminho), raiz]) != raiz:
+            return None
+        return url_estatica(caminho)
+
+    def publicar(self, caminho):
+        """Nada a enviar: o arquivo já é servido direto do disco"""
+        return True
+
+class ArmazenamentoS3:
+    """Publica as imagens em um bucket compatível com S3 (AWS, MinIO etc.)
+
+    Cada arquivo é enviado uma única vez, com Content-Type e
+    CACHE_CONTROL_IMAGENS, por quem grava a imagem (a fila de imagens, a
+    importação ou o comando `publicar-imagens`). As chaves derivam do
+    conteúdo, então a URL é montada sem consultar o bucket: renderizar uma
+    página nunca faz chamadas ao S3.
+    """
+
+    def __init__(self, bucket, prefixo="", endpoint=None, url_publica=None):
+        try:
+            import boto3
+            from botocore.exceptions import BotoCoreError, ClientError
+        except ImportError as e:
+            raise RuntimeError("O armazenamento de imagens em S3 requer o pacote boto3") from e
+
+        self.bucket = bucket
+        self.prefixo = prefixo.strip("/")
+        self.cliente = boto3.client("s3", endpoint_url=endpoint)
+        if not url_publica:
+            url_publica = f"{endpoint.rstrip('/')}/{bucket}" if endpoint else f"https://{bucket}.s3.amazonaws.com"
+        self.url_publica = url_publica.rstrip("/")
+        self._erro_cliente = ClientError
+        self._erros = (BotoCoreError, ClientError, OSError)
+        self._publicados = set()
+
+    def _chave(self, caminho):
+        relativo = os.path.relpath(caminho).replace(os.sep, "/")
+        return f"{self.prefixo}/{relativo}" if self.prefixo else relativo
+
+    def publicar(self, caminho):
+        """Envia o arquivo ao bucket, se a chave ainda não existir; retorna False se o bucket falhar"""
+        chave = self._chave(caminho)
+        if chave in self._publicados:
+            return True
+
+        try:
+            self.cliente.head_object(Bucket=self.bucket, Key=chave)
+        except self._erro_cliente as e:
+            if e.response.get("Error", {}).get("Code") not in ("404", "NoSuchKey", "NotFound"):
+                return False
+            try:
+                with medir("imagem", "s3.upload_file"):
+                    self.cliente.upload_file(caminho, self.bucket, chave, ExtraArgs={
+                        "ContentType": mimetypes.guess_type(caminho)[0] or "application/octet-stream",
+                        "CacheControl": CACHE_CONTROL_IMAGENS
+                    })
+            except self._erros:
+                return False
+        except self._erros:
+            return False
+        self._publicados.add(chave)
+        return True
+
+    def url(self, caminho):
+        """Retorna a URL pública do arquivo, sem consultar o bucket"""
+        return f"{self.url_publica}/{urllib.parse.quote(self._chave(caminho))}"
+
+def abrir_armazenamento_imagens(url):
+    """Cria o armazenamento de imagens indicado pela URL: local (padrão) ou s3://bucket/prefixo
+
+    Para S3, POKEDEX_S3_ENDPOINT aponta para serviços compatíveis (como o
+    MinIO) e POKEDEX_IMAGENS_URL_PUBLICA para a CDN; as credenciais seguem as
+    variáveis padrão da AWS.
+    """
+    if not url or url == "local":
+        return ArmazenamentoLocal()
+    esquema, _, resto = url.partition("://")
+    if esquema != "s3":
+        raise RuntimeError(f"Armazenamento de imagens não suportado: {url!r} (use local ou s3://bucket/prefixo)")
+    bucket, _, prefixo = resto.partition("/")
+    return ArmazenamentoS3(
+        bucket, prefixo, os.environ.get("POKEDEX_S3_ENDPOINT"), os.environ.get("POKEDEX_IMAGENS_URL_PUBLICA")
+    )
+
+@st.cache_resource
+def get_armazenamento_imagens():
+    """Retorna o armazenamento de imagens do processo, configurado por POKEDEX_IMAGENS_URL"""
+    return abrir_armazenamento_imagens(os.environ.get("POKEDEX_IMAGENS_URL"))
+
+def exibir_imagem(caminho):
+    """Mostra a imagem pela URL do armazenamento; sem URL, envia os bytes com st.image"""
+    url = get_armazenamento_imagens().url(caminho)
+    with medir("imagem", "st.image"):
+        if url:
+            st.html(f'<img src="{html.escape(url)}" loading="lazy" decoding="async" style="width: 100%">')
+        else:
+            st.image(caminho, use_container_width=True)
+
+ESTILO_GRADE_POKEMON = """
+<style>
+.pokedex-grade { display: grid; grid-template-columns: repeat(auto-fill, minmax(180px, 1fr)); gap: 1rem; }
+.pokedex-card { border: 1px solid rgba(128, 128, 128, 0.3); border-radius: 0.5rem; padding: 0.75rem; }
+.pokedex-card img { width: 100%; aspect-ratio: 1; object-fit: contain; }
+.pokedex-card .sem-imagem { aspect-ratio: 1; display: flex; align-items: center; justify-content: center; opacity: 0.6; }
+.pokedex-card h4 { margin: 0.5rem 0 0.25rem; padding: 0; }
+.pokedex-tipo { display: inline-block; border-radius: 0.25rem; padding: 0 0.4rem; margin-right: 0.25rem; font-weight: bold; }
+.pokedex-tipo.primario { background: rgba(33, 195, 84, 0.2); }
+.pokedex-tipo.secundario { background: rgba(28, 131, 225, 0.2); }
+.pokedex-card small { display: block; opacity: 0.7; }
+</style>
+"""
+
+MENSAGENS_IMAGEM_INDISPONIVEL = {
+    IMAGEM_PROCESSANDO: "Processando imagem...",
+    IMAGEM_PRONTA: "Imagem não encontrada",
+    IMAGEM_ERRO: "Falha ao processar imagem",
+}
+
+def html_grade_pokemons(pokemons):
+    """Monta a grade de cartões em um único bloco HTML, com miniaturas carregadas sob demanda"""
+    cartoes = []
+    for pokemon in pokemons:
+        miniatura = gerar_miniatura(pokemon[4]) if imagem_disponivel(pokemon[4]) else None
+        url = get_armazenamento_imagens().url(miniatura) if miniatura else None
+        if url:
+            imagem = (f'<img src="{html.escape(url)}" loading="lazy" '
+                      f'decoding="async" alt="{html.escape(pokemon[1])}">')
+        else:
+            imagem = f'<div class="sem-imagem">{MENSAGENS_IMAGEM_INDISPONIVEL[pokemon[8]]}</div>'
+
+        tipos = f'<span class="pokedex-tipo primario">{html.escape(pokemon[2])}</span>'
+        if pokemon[3]:
+            tipos += f'<span class="pokedex-tipo secundario">{html.escape(pokemon[3])}</span>'
+
+        cartoes.append(
+            f'<div class="pokedex-card">{imagem}'
+            f'<h4>#{pokemon[0]:03d} {html.escape(pokemon[1])}</h4>{tipos}'
+            f'<small>Treinador: {html.escape(pokemon[5])} ({html.escape(pokemon[6])})</small>'
+            f'<small>Cadastrado em: {html.escape(str(pokemon[7])[:10])}</small></div>'
+        )
+    return f'{ESTILO_GRADE_POKEMON}<div class="pokedex-grade">{"".join(cartoes)}</div>'
+
+@cache_por_versao
+def get_catalogo_tipos():
+    """Retorna o catálogo de tipos {id: nome}"""
+    with conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, nome FROM tipos")
+        catalogo = dict(cursor.fetchall())
+    return catalogo
+
+def registrar_tipos(conn, nomes):
+    """Inclui no catálogo os tipos ainda não cadastrados, dentro da transação de escrita"""
+    conn.executemany(
+        "INSERT OR IGNORE INTO tipos (nome) VALUES (?)",
+        [(nome,) for nome in set(nomes) if nome]
+    )
+
+# Os tipos são gravados pelo nome e convertidos para o id do catálogo no próprio INSERT
+SQL_ID_TIPO = "(SELECT id FROM tipos WHERE nome = ?)"
+
+SQL_INSERT_POKEMON = f"""INSERT INTO pokemons
+    (nome, tipo1_id, tipo2_id, treinador_id, imagem_path)
+    VALUES (?, {SQL_ID_TIPO}, {SQL_ID_TIPO}, ?, ?)"""
+
+def insert_pokemon(nome, tipo1, tipo2, treinador_id, imagem_path):
+    """Insere um novo Pokémon no banco"""
+    try:
+        with conexao_escrita() as conn:
+            registrar_tipos(conn, (tipo1, tipo2))
+            conn.execute(SQL_INSERT_POKEMON, (nome, tipo1, tipo2, treinador_id, imagem_path))
+        return True, "Pokémon cadastrado com sucesso!"
+    except sqlite3.Error as e:
+        return False, f"Erro ao cadastrar Pokémon: {e}"
+
+@st.cache_resource
+def get_fila_imagens():
+    """Retorna o pool de threads que processa as imagens enviadas"""
+    return ThreadPoolExecutor(max_workers=TRABALHADORES_IMAGEM, thread_name_prefix="imagens")
+
+def publicar_imagem(imagem_path):
+    """Gera a miniatura e envia imagem e miniatura ao armazenamento; retorna se ambas foram publicadas
+
+    Uma falha não invalida a imagem: o comando `publicar-imagens` tenta de novo.
+    """
+    armazenamento = get_armazenamento_imagens()
+    miniatura = gerar_miniatura(imagem_path)
+    publicada = armazenamento.publicar(imagem_path)
+    return (armazenamento.publicar(miniatura) if miniatura else False) and publicada
+
+def validar_e_armazenar_imagem(conteudo, nome_arquivo):
+    """Valida o formato da imagem, grava no armazenamento e gera a miniatura; retorna o caminho"""
+    with Image.open(io.BytesIO(conteudo)) as imagem:
+        if imagem.format not in FORMATOS_IMAGEM_ACEITOS:
+            raise ValueError(f"Formato de imagem não suportado: {imagem.format}")
+        imagem.verify()
+
+    with medir("imagem", "salvar_imagem"):
+        imagem_path = armazenar_conteudo(io.BytesIO(conteudo), nome_arquivo)
+    publicar_imagem(imagem_path)
+    return imagem_path
+
+def caminho_pendente(pokemon_id, nome_arquivo):
+    """Caminho onde o envio de um Pokémon aguarda o processamento em segundo plano"""
+    return os.path.join(PENDENTES_DIR, f"{pokemon_id}{_extensao_normalizada(nome_arquivo)}")
+
+def processar_imagem_pokemon(pokemon_id, pendente):
+    """Valida, armazena e gera a miniatura da imagem de um Pokémon já cadastrado
+
+    Roda fora da thread do Streamlit; ao final atualiza `imagem_path` e
+    `imagem_status`, o que invalida as leituras em cache, e apaga o arquivo
+    `pendente` com o envio original.
+    """
+    try:
+        with open(pendente, "rb") as arquivo:
+            imagem_path = validar_e_armazenar_imagem(arquivo.read(), pendente)
+        imagem_status = IMAGEM_PRONTA
+    except Exception:
+        # O Pillow também levanta SyntaxError, entre outros, para arquivos corrompidos;
+        # qualquer falha precisa sair de 'processando'
+        imagem_path = None
+        imagem_status = IMAGEM_ERRO
+
+    with conexao_escrita() as conn:
+        conn.execute(
+            "UPDATE pokemons SET imagem_path = ?, imagem_status = ? WHERE id = ?",
+            (imagem_path, imagem_status, pokemon_id)
+        )
+    if os.path.exists(pendente):
+        os.remove(pendente)
+
+def cadastrar_pokemon_com_imagem(nome, tipo1, tipo2, treinador_id, uploaded_file):
+    """Cadastra o Pokémon na hora e envia a imagem para processamento em segundo plano
+
+    O envio é gravado em PENDENTES_DIR antes do commit, para que um reinício
+    do processo não perca a imagem (veja `retomar_imagens_pendentes`).
+    """
+    pendente = None
+    try:
+        with conexao_escrita() as conn:
+            registrar_tipos(conn, (tipo1, tipo2))
+            cursor = conn.execute(
+                f"""INSERT INTO pokemons 
+                (nome, tipo1_id, tipo2_id, treinador_id, imagem_status) 
+                VALUES (?, {SQL_ID_TIPO}, {SQL_ID_TIPO}, ?, ?)""",
+                (nome, tipo1, tipo2, treinador_id, IMAGEM_PROCESSANDO)
+            )
+            pendente = caminho_pendente(cursor.lastrowid, uploaded_file.name)
+            with open(pendente, "wb") as destino:
+                destino.write(uploaded_file.getvalue())
+                destino.flush()
+                os.fsync(destino.fileno())
+            pokemon_id = cursor.lastrowid
+    except (sqlite3.Error, OSError) as e:
+        if pendente and os.path.exists(pendente):
+            os.remove(pendente)
+        return False, f"Erro ao cadastrar Pokémon: {e}"
+
+    get_fila_imagens().submit(processar_imagem_pokemon, pokemon_id, pendente)
+    return True, "Pokémon cadastrado com sucesso! A imagem está sendo processada."
+
+def retomar_imagens_pendentes():
+    """Reenfileira as imagens que ficaram em 'processando' quando o processo parou
+
+    Pokémon sem o envio em PENDENTES_DIR passam a 'erro', e envios sem
+    Pokémon em 'processando' são apagados. Retorna quantas imagens voltaram à fila.
+    """
+    pendentes = {}
+    for nome in os.listdir(PENDENTES_DIR):
+        pendentes[os.path.splitext(nome)[0]] = os.path.join(PENDENTES_DIR, nome)
+
+    with conexao_leitura() as conn:
+        cursor = conn.cursor()
+        # Literal, e não parâmetro, para o SQLite usar o índice parcial idx_pokemons_processando
+        cursor.execute(f"SELECT id FROM pokemons WHERE imagem_status = '{IMAGEM_PROCESSANDO}'")
+        processando = [row[0] for row in cursor.fetchall()]
+
+    perdidas = []
+    for pokemon_id in processando:
+        pendente = pendentes.pop(str(pokemon_id), None)
+        if pendente is None:
+            perdidas.append((IMAGEM_ERRO, pokemon_id))
+        else:
+            get_fila_imagens().submit(processar_imagem_pokemon, pokemon_id, pendente)
+    if perdidas:
+        with conexao_escrita() as conn:
+            conn.executemany("UPDATE pokemons SET imagem_status = ? WHERE id = ?", perdidas)
+    for pendente in pendentes.values():
+        os.remove(pendente)
+    return len(processando) - len(perdidas)
+
+def _texto_celula(valor):
+    return valor.strip() if isinstance(valor, str) else ""
+
+def cadastrar_equipe(treinador_id, linhas, arquivos):
+    """Cadastra vários Pokémon de um treinador de uma só vez
+
+    `linhas` são dicionários com nome, tipo1, tipo2 e imagem (nome do
+    arquivo enviado; se vazio, procura um arquivo com o nome do Pokémon).
+    Todas as linhas são validadas antes de gravar qualquer coisa; as imagens
+    são processadas em paralelo e os registros entram em uma única transação.
+    Retorna (sucesso, mensagem, [(linha, motivo)]).
+    """
+    arquivos_por_nome = {arquivo.name: arquivo for arquivo in arquivos}
+    arquivos_por_pokemon = {os.path.splitext(nome)[0].lower(): arquivo for nome, arquivo in arquivos_por_nome.items()}
+
+    registros = []
+    erros = []
+    for numero, linha in enumerate(linhas, start=1):
+        nome = _texto_celula(linha.get('nome'))
+        tipo1 = _texto_celula(linha.get('tipo1'))
+        tipo2 = _texto_celula(linha.get('tipo2')) or None
+        nome_imagem = _texto_celula(linha.get('imagem'))
+        if not (nome or tipo1 or tipo2 or nome_imagem):
+            continue
+
+        arquivo = arquivos_por_nome.get(nome_imagem) if nome_imagem else arquivos_por_pokemon.get(nome.lower())
+        if not nome:
+            erros.append((numero, "O nome do Pokémon é obrigatório!"))
+        elif not tipo1:
+            erros.append((numero, "O tipo primário é obrigatório!"))
+        elif arquivo is None:
+            erros.append((numero, "O upload de imagem é obrigatório!"))
+        else:
+            registros.append((numero, nome, tipo1, tipo2, arquivo))
+
+    if erros:
+        return False, "Corrija as linhas indicadas; nenhum Pokémon foi cadastrado.", erros
+    if not registros:
+        return False, "Preencha pelo menos um Pokémon!", []
+
+    futuros = [
+        get_fila_imagens().submit(validar_e_armazenar_imagem, arquivo.getvalue(), arquivo.name)
+        for _, _, _, _, arquivo in registros
+    ]
+    valores = []
+    for (numero, nome, tipo1, tipo2, arquivo), futuro in zip(registros, futuros):
+        try:
+            valores.append((nome, tipo1, tipo2, treinador_id, futuro.result()))
+        except Exception as e:
+            erros.append((numero, f"Imagem inválida ({arquivo.name}): {e}"))
+    if erros:
+        return False, "Corrija as linhas indicadas; nenhum Pokémon foi cadastrado.", erros
+
+    try:
+        with conexao_escrita() as conn:
+            registrar_tipos(conn, [tipo for valor in valores for tipo in valor[1:3]])
+            conn.executemany(SQL_INSERT_POKEMON, valores)
+    except sqlite3.Error as e:
+        return False, f"Erro ao cadastrar Pokémon: {e}", []
+    return True, f"{len(valores)} Pokémon cadastrados com sucesso!", []
+
+@cache_por_versao
+def get_all_pokemons():
+    """Retorna todos os Pokémon com informações dos treinadores, em um DataFrame colunar"""
+    with conexao_leitura() as conn:
+        pokemons = ler_frame(conn, """
+            SELECT p.id, p.nome, t1.nome as tipo1, t2.nome as tipo2, p.imagem_path,
+                   t.nome as treinador_nome, t.cidade as treinador_cidade,
+                   p.data_cadastro
+            FROM pokemons p
+            JOIN treinadores t ON p.treinador_id = t.id
+            JOIN tipos t1 ON p.tipo1_id = t1.id
+            LEFT JOIN tipos t2 ON p.tipo2_id = t2.id
+            ORDER BY p.nome
+        """, categorias=('tipo1', 'tipo2', 'treinador_nome', 'treinador_cidade'))
+    return pokemons
+
+POKEMONS_POR_PAGINA = 30
+TREINADORES_POR_PAGINA = 10
+TREINADORES_NO_GRAFICO = 20
+
+def consulta_busca_textual(texto):
+    """Converte o texto digitado em uma consulta FTS5: todas as palavras, por prefixo"""
+    palavras = re.findall(r"\w+", texto)
+    return " ".join(f'"{palavra}"*' for palavra in palavras)
+
+def consulta_busca_aproximada(texto):
+    """Converte o texto em uma consulta por trigramas, que tolera erros de digitação"""
+    trigramas = {
+        palavra[i:i + 3]
+        for palavra in re.findall(r"\w+", texto.lower())
+        for i in range(len(palavra) - 2)
+    }
+    return " OR ".join(f'"{trigrama}"' for trigrama in sorted(trigramas))
+
+def _montar_filtros_pokemon(filtro_nome=None, filtro_tipo=None, filtro_treinador_id=None,
+                            busca_aproximada=False):
+    """Monta a junção com a busca textual, a cláusula WHERE e os parâmetros dos filtros da Pokédex
+
+    `filtro_nome` é buscado no índice FTS5 (nome, tipos, treinador e cidade,
+    sem diferenciar acentos) e a junção expõe a relevância como `b.rank`
+    (bm25, menor é melhor); `filtro_tipo` é o id do tipo no catálogo. Com
+    `busca_aproximada`, usa os LIMITE_BUSCA_APROXIMADA nomes mais parecidos
+    pelo índice de trigramas.
+    """
+    juncao = ""
+    condicoes = []
+    params = []
+
+    if filtro_nome and busca_aproximada:
+        juncao = """JOIN (
+            SELECT rowid AS id, rank FROM busca_pokemons_trigram
+            WHERE busca_pokemons_trigram MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        ) b ON b.id = p.id"""
+        params.extend([consulta_busca_aproximada(filtro_nome) or '""', LIMITE_BUSCA_APROXIMADA])
+    elif filtro_nome:
+        juncao = """JOIN (
+            SELECT rowid AS id, rank FROM busca_pokemons
+            WHERE busca_pokemons MATCH ?
+            ORDER BY rank
+        ) b ON b.id = p.id"""
+        params.append(consulta_busca_textual(filtro_nome) or '""')
+    if filtro_tipo:
+        condicoes.append("(p.tipo1_id = ? OR p.tipo2_id = ?)")
+        params.extend([filtro_tipo, filtro_tipo])
+    if filtro_treinador_id is not None:
+        condicoes.append("p.treinador_id = ?")
+        params.append(filtro_treinador_id)
+
+    where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+    return juncao, where, params
+
+SQL_PAGINA_POKEMONS = """
+    SELECT p.id, p.nome, t1.nome as tipo1, t2.nome as tipo2, p.imagem_path,
+           t.nome as treinador_nome, t.cidade as treinador_cidade,
+           p.data_cadastro, p.imagem_status, {ordem} as ordem
+    FROM pokemons p
+    JOIN treinadores t ON p.treinador_id = t.id
+    JOIN tipos t1 ON p.tipo1_id = t1.id
+    LEFT JOIN tipos t2 ON p.tipo2_id = t2.id
+    {where}
+"""
+
+@st.cache_data(max_entries=CACHE_MAX_ENTRADAS, show_spinner=False)
+def get_ids_busca(versao, filtro_nome, filtro_tipo=None, filtro_treinador_id=None, busca_aproximada=False):
+    """Retorna os ids que atendem aos filtros, do mais ao menos relevante para `filtro_nome`
+
+    É o retrato da busca na `versao` dos dados: o bm25 de cada linha muda a
+    cada inserção, então as páginas seguintes paginam por posição neste
+    retrato em vez de pela relevância. Se ele sair do cache, é refeito com os
+    dados atuais.
+    """
+    juncao, where, params = _montar_filtros_pokemon(filtro_nome, filtro_tipo, filtro_treinador_id,
+                                                    busca_aproximada)
+    with conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT p.id
+            FROM pokemons p
+            {juncao}
+            JOIN treinadores t ON p.treinador_id = t.id
+            {where}
+            ORDER BY b.rank, p.id
+        """, params)
+        ids = tuple(row[0] for row in cursor.fetchall())
+    return ids
+
+@cache_por_versao
+def get_pagina_pokemons(filtro_nome=None, filtro_tipo=None, filtro_treinador_id=None,
+                        busca_aproximada=False, apos=None, limite=POKEMONS_POR_PAGINA, versao_busca=None):
+    """Retorna uma página de Pokémon filtrada no banco, paginada por (ordem, id)
+
+    A ordem vem na última coluna: o nome ou, na busca por nome, a posição no
+    retrato de `get_ids_busca` tirado na `versao_busca` (padrão: a atual).
+    `apos` é a chave (ordem, id) do último Pokémon da página anterior.
+    """
+    if filtro_nome:
+        ids = get_ids_busca(versao_dados() if versao_busca is None else versao_busca,
+                            filtro_nome, filtro_tipo, filtro_treinador_id, busca_aproximada)
+        inicio = 0 if apos is None else apos[0] + 1
+        posicoes = {pokemon_id: inicio + i for i, pokemon_id in enumerate(ids[inicio:inicio + limite])}
+        if not posicoes:
+            return []
+        with conexao_leitura() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                SQL_PAGINA_POKEMONS.format(ordem="NULL", where=f"WHERE p.id IN ({', '.join('?' * len(posicoes))})"),
+                list(posicoes)
+            )
+            linhas = cursor.fetchall()
+        # Removidos depois do retrato simplesmente não voltam
+        return sorted((linha[:-1] + (posicoes[linha[0]],) for linha in linhas), key=lambda linha: linha[-1])
+
+    _, where, params = _montar_filtros_pokemon(filtro_nome, filtro_tipo, filtro_treinador_id)
+    if apos is not None:
+        where = f"{where} AND (p.nome, p.id) > (?, ?)" if where else "WHERE (p.nome, p.id) > (?, ?)"
+        params.extend(apos)
+
+    with conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            SQL_PAGINA_POKEMONS.format(ordem="p.nome", where=where) + "ORDER BY p.nome, p.id LIMIT ?",
+            params + [limite]
+        )
+        pokemons = cursor.fetchall()
+    return pokemons
+
+@cache_por_versao
+def contar_pokemons(filtro_nome=None, filtro_tipo=None, filtro_treinador_id=None,
+                    busca_aproximada=False):
+    """Conta os Pokémon que atendem aos filtros da Pokédex"""
+    if filtro_nome:
+        # A busca já precisa ranquear todas as linhas; o retrato atual serve também para a contagem
+        return len(get_ids_busca(versao_dados(), filtro_nome, filtro_tipo, filtro_treinador_id, busca_aproximada))
+    _, where, params = _montar_filtros_pokemon(filtro_nome, filtro_tipo, filtro_treinador_id)
+
+    with conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT COUNT(*)
+            FROM pokemons p
+            JOIN treinadores t ON p.treinador_id = t.id
+            {where}
+        """, params)
+        total = cursor.fetchone()[0]
+    return total
+
+def get_ultima_alteracao():
+    """Retorna o id da alteração mais recente do log (0 se ele estiver vazio)"""
+    with conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM log_alteracoes")
+        ultima = cursor.fetchone()[0]
+    return ultima
+
+def get_alteracoes(apos, limite=LIMITE_ALTERACOES_POR_CONSULTA):
+    """Retorna (id, tabela, registro_id, operacao) das alterações com id maior que `apos`"""
+    with conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id, tabela, registro_id, operacao
+            FROM log_alteracoes
+            WHERE id > ?
+            ORDER BY id
+            LIMIT ?
+        """, (apos, limite))
+        alteracoes = cursor.fetchall()
+    return alteracoes
+
+def get_pokemons_por_id(ids):
+    """Retorna os Pokémon com os ids informados, nas mesmas colunas de `get_pagina_pokemons`"""
+    ids = list(ids)
+    if not ids:
+        return []
+    with conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT p.id, p.nome, t1.nome as tipo1, t2.nome as tipo2, p.imagem_path,
+                   t.nome as treinador_nome, t.cidade as treinador_cidade,
+                   p.data_cadastro, p.imagem_status
+            FROM pokemons p
+            JOIN treinadores t ON p.treinador_id = t.id
+            JOIN tipos t1 ON p.tipo1_id = t1.id
+            LEFT JOIN tipos t2 ON p.tipo2_id = t2.id
+            WHERE p.id IN ({", ".join("?" * len(ids))})
+        """, ids)
+        pokemons = cursor.fetchall()
+    return pokemons
+
+@cache_por_versao
+def get_resumo_pokedex():
+    """Retorna as métricas gerais da Pokédex a partir das estatísticas materializadas"""
+    with conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT total_pokemons, com_dois_tipos FROM estatisticas_gerais")
+        total_pokemons, com_dois_tipos = cursor.fetchone()
+        cursor.execute("SELECT COUNT(*) FROM estatisticas_treinadores WHERE total_pokemons > 0")
+        total_treinadores = cursor.fetchone()[0]
+
+    return {
+        'total_pokemons': total_pokemons,
+        'total_treinadores': total_treinadores,
+        'com_dois_tipos': com_dois_tipos
+    }
+
+@cache_por_versao
+def get_tipos_cadastrados():
+    """Retorna os ids dos tipos usados pelos Pokémon, em ordem alfabética do nome"""
+    with conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT e.tipo_id
+            FROM estatisticas_tipos e
+            JOIN tipos t ON t.id = e.tipo_id
+            WHERE e.total > 0
+            ORDER BY t.nome
+        """)
+        tipos = [row[0] for row in cursor.fetchall()]
+    return tipos
+
+@cache_por_versao
+def get_contagem_tipos():
+    """Retorna um DataFrame (tipo, total), do tipo mais frequente ao menos frequente"""
+    with conexao_leitura() as conn:
+        contagem = ler_frame(conn, """
+            SELECT t.nome as tipo, e.total
+            FROM estatisticas_tipos e
+            JOIN tipos t ON t.id = e.tipo_id
+            WHERE e.total > 0
+            ORDER BY e.total DESC, t.nome
+        """, categorias=('tipo',))
+    return contagem
+
+@cache_por_versao
+def get_estatisticas():
+    """Retorna estatísticas do sistema"""
+    with conexao_leitura() as conn:
+        cursor = conn.cursor()
+    
+        cursor.execute("SELECT total_treinadores, total_pokemons FROM estatisticas_gerais")
+        total_treinadores, total_pokemons = cursor.fetchone()
+    
+        cursor.execute("""
+            SELECT t.nome, e.total_pokemons as total 
+            FROM estatisticas_treinadores e 
+            JOIN treinadores t ON t.id = e.treinador_id 
+            ORDER BY e.total_pokemons DESC 
+            LIMIT 1
+        """)
+        treinador_mais_pokemons = cursor.fetchone()
+    
+    return {
+        'total_treinadores': total_treinadores,
+        'total_pokemons': total_pokemons,
+        'treinador_mais_pokemons': treinador_mais_pokemons
+    }
+
+@cache_por_versao
+def get_pokemons_por_treinador(limite=None):
+    """Retorna um DataFrame com nome, cidade e total de Pokémon dos `limite` treinadores com mais Pokémon"""
+    with conexao_leitura() as conn:
+        stats_treinadores = ler_frame(conn, """
+            SELECT t.nome, t.cidade, e.total_pokemons
+            FROM estatisticas_treinadores e
+            JOIN treinadores t ON t.id = e.treinador_id
+            ORDER BY e.total_pokemons DESC
+            LIMIT ?
+        """, params=(-1 if limite is None else limite,), categorias=('cidade',))
+    return stats_treinadores
+
+@cache_por_versao
+def get_ranking_treinadores(apos=None, limite=TREINADORES_POR_PAGINA):
+    """Retorna (id, nome, cidade, total) de uma página do ranking de treinadores
+
+    Percorre o índice de estatisticas_treinadores por (total, id) decrescente;
+    `apos` é a chave (total, id) do último treinador da página anterior.
+    """
+    where = ""
+    params = []
+    if apos is not None:
+        where = "WHERE (e.total_pokemons, e.treinador_id) < (?, ?)"
+        params = list(apos)
+
+    with conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT e.treinador_id, t.nome, t.cidade, e.total_pokemons
+            FROM estatisticas_treinadores e
+            JOIN treinadores t ON t.id = e.treinador_id
+            {where}
+            ORDER BY e.total_pokemons DESC, e.treinador_id DESC
+            LIMIT ?
+        """, params + [limite])
+        ranking = cursor.fetchall()
+    return ranking
+
+@cache_por_versao
+def get_treinador(treinador_id):
+    """Retorna (id, nome, cidade, data_cadastro, total de Pokémon) do treinador, ou None"""
+    with conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT t.id, t.nome, t.cidade, t.data_cadastro, e.total_pokemons
+            FROM treinadores t
+            JOIN estatisticas_treinadores e ON e.treinador_id = t.id
+            WHERE t.id = ?
+        """, (treinador_id,))
+        treinador = cursor.fetchone()
+    return treinador
+
+def formato_por_nome(nome_arquivo):
+    """Deduz o formato (csv ou jsonl) pela extensão do arquivo"""
+    extensao = os.path.splitext(nome_arquivo)[1].lower()
+    if extensao == ".csv":
+        return "csv"
+    if extensao in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Formato de arquivo não suportado: {extensao or nome_arquivo}")
+
+def ler_registros(arquivo_texto, formato):
+    """Lê um arquivo CSV ou JSONL registro a registro, junto com o número da linha"""
+    if formato == "csv":
+        leitor = csv.DictReader(arquivo_texto)
+        for registro in leitor:
+            yield leitor.line_num, registro
+    elif formato == "jsonl":
+        for numero, linha in enumerate(arquivo_texto, start=1):
+            if not linha.strip():
+                continue
+            try:
+                registro = json.loads(linha)
+            except json.JSONDecodeError:
+                registro = None
+            yield numero, registro if isinstance(registro, dict) else None
+    else:
+        raise ValueError(f"Formato de arquivo não suportado: {formato}")
+
+def _campo_texto(registro, campo):
+    valor = registro.get(campo)
+    return str(valor).strip() if valor is not None else ""
+
+def _mapa_treinadores():
+    """Mapeia rótulo "nome - cidade", nome e id de cada treinador para o id
+
+    Nomes de mais de um treinador mapeiam para None, pois são ambíguos.
+    """
+    with conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, nome, cidade FROM treinadores")
+        treinadores = cursor.fetchall()
+
+    mapa = {}
+    nomes = {}
+    for id_treinador, nome, cidade in treinadores:
+        mapa[f"{nome} - {cidade}"] = id_treinador
+        mapa[str(id_treinador)] = id_treinador
+        nomes.setdefault(nome, []).append(id_treinador)
+    for nome, ids in nomes.items():
+        mapa.setdefault(nome, ids[0] if len(ids) == 1 else None)
+    return mapa
+
+def _validar_treinador(registro):
+    """Valida um registro de treinador com as regras do formulário"""
+    nome = _campo_texto(registro, "nome")
+    cidade = _campo_texto(registro, "cidade")
+    if not nome or not cidade:
+        return None, "Preencha todos os campos obrigatórios!"
+    return (nome, cidade), None
+
+def _importar_imagem(imagem, diretorio_imagens):
+    """Valida e armazena a imagem de um registro importado; retorna (caminho, motivo da rejeição)
+
+    Só são lidos arquivos dentro de `diretorio_imagens`; sem diretório, a
+    coluna `imagem` é recusada.
+    """
+    if diretorio_imagens is None:
+        return None, "Imagens não são aceitas nesta importação"
+    raiz = os.path.realpath(diretorio_imagens)
+    caminho = os.path.realpath(os.path.join(raiz, imagem))
+    if os.path.commonpath([raiz, caminho]) != raiz:
+        return None, f"Imagem fora do diretório de importação: {imagem}"
+    if not os.path.isfile(caminho):
+        return None, f"Imagem não encontrada: {imagem}"
+    try:
+        with open(caminho, "rb") as arquivo:
+            return validar_e_armazenar_imagem(arquivo.read(), caminho), None
+    except Exception as e:
+        return None, f"Imagem inválida ({imagem}): {e}"
+
+def _validar_pokemon(registro, mapa_treinadores, diretorio_imagens=None):
+    """Valida um registro de Pokémon com as regras do formulário"""
+    nome = _campo_texto(registro, "nome")
+    tipo1 = _campo_texto(registro, "tipo1")
+    tipo2 = _campo_texto(registro, "tipo2") or None
+    treinador = _campo_texto(registro, "treinador_id") or _campo_texto(registro, "treinador")
+    imagem = _campo_texto(registro, "imagem") or None
+
+    if not nome:
+        return None, "O nome do Pokémon é obrigatório!"
+    if not tipo1:
+        return None, "O tipo primário é obrigatório!"
+    if not treinador:
+        return None, "A seleção do treinador é obrigatória!"
+    if treinador not in mapa_treinadores:
+        return None, f"Treinador não encontrado: {treinador}"
+    if mapa_treinadores[treinador] is None:
+        return None, f"Há mais de um treinador chamado {treinador}; use \"nome - cidade\" ou o id"
+    if imagem:
+        imagem, motivo = _importar_imagem(imagem, diretorio_imagens)
+        if motivo:
+            return None, motivo
+
+    return (nome, tipo1, tipo2, mapa_treinadores[treinador], imagem), None
+
+def importar_registros(registros, tipo, tamanho_lote=TAMANHO_LOTE_IMPORTACAO, diretorio_imagens=None):
+    """Importa treinadores ou Pokémon em lotes, um `executemany` por transação
+
+    `registros` é um iterável de pares (número da linha, dicionário), como o
+    gerado por `ler_registros`. A coluna `imagem` é um caminho relativo a
+    `diretorio_imagens`; sem ele, registros com imagem são rejeitados.
+    Retorna um relatório com inseridos, rejeitados (até
+    MAX_REJEITADOS_RELATORIO exemplos) e vazão.
+    """
+    if tipo == "treinadores":
+        sql = "INSERT INTO treinadores (nome, cidade) VALUES (?, ?)"
+        validar = _validar_treinador
+    elif tipo == "pokemons":
+        sql = SQL_INSERT_POKEMON
+        mapa_treinadores = _mapa_treinadores()
+        validar = lambda registro: _validar_pokemon(registro, mapa_treinadores, diretorio_imagens)
+    else:
+        raise ValueError(f"Tipo de importação desconhecido: {tipo}")
+
+    inicio = time.perf_counter()
+    inseridos = 0
+    total_rejeitados = 0
+    rejeitados = []
+    registros = iter(registros)
+
+    while True:
+        lote = list(itertools.islice(registros, tamanho_lote))
+        if not lote:
+            break
+
+        validos = []
+        for numero, registro in lote:
+            if registro is None:
+                valores, motivo = None, "Linha inválida"
+            else:
+                valores, motivo = validar(registro)
+            if motivo:
+                total_rejeitados += 1
+                if len(rejeitados) < MAX_REJEITADOS_RELATORIO:
+                    rejeitados.append((numero, motivo))
+            else:
+                validos.append(valores)
+
+        if validos:
+            with conexao_escrita() as conn:
+                if tipo == "pokemons":
+                    registrar_tipos(conn, [nome_tipo for valores in validos for nome_tipo in valores[1:3]])
+                conn.executemany(sql, validos)
+            inseridos += len(validos)
+
+    segundos = time.perf_counter() - inicio
+    return {
+        'inseridos': inseridos,
+        'total_rejeitados': total_rejeitados,
+        'rejeitados': rejeitados,
+        'segundos': segundos,
+        'registros_por_segundo': (inseridos + total_rejeitados) / segundos if segundos else 0.0
+    }
+
+COLUNAS_EXPORTACAO = [
+    'id', 'nome', 'tipo1', 'tipo2', 'imagem_path',
+    'treinador_nome', 'treinador_cidade', 'data_cadastro'
+]
+
+def iterar_pokemons(tamanho_lote=TAMANHO_LOTE_EXPORTACAO):
+    """Percorre os Pokémon de `get_all_pokemons` em lotes de `fetchmany`"""
+    with conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT p.id, p.nome, t1.nome as tipo1, t2.nome as tipo2, p.imagem_path,
+                   t.nome as treinador_nome, t.cidade as treinador_cidade,
+                   p.data_cadastro
+            FROM pokemons p
+            JOIN treinadores t ON p.treinador_id = t.id
+            JOIN tipos t1 ON p.tipo1_id = t1.id
+            LEFT JOIN tipos t2 ON p.tipo2_id = t2.id
+            ORDER BY p.nome
+        """)
+        while True:
+            lote = cursor.fetchmany(tamanho_lote)
+            if not lote:
+                break
+            yield lote
+
+def exportar_pokemons(destino, formato, tamanho_lote=TAMANHO_LOTE_EXPORTACAO):
+    """Escreve a Pokédex em `destino` (arquivo binário) no formato csv, jsonl ou parquet
+
+    Os dados são lidos e gravados lote a lote, então o uso de memória não
+    depende do tamanho da tabela. Retorna o número de Pokémon exportados.
+    """
+    total = 0
+
+    if formato == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("A exportação em Parquet requer o pacote pyarrow") from e
+
+        esquema = pa.schema([
+            ('id', pa.int64()), ('nome', pa.string()), ('tipo1', pa.string()),
+            ('tipo2', pa.string()), ('imagem_path', pa.string()),
+            ('treinador_nome', pa.string()), ('treinador_cidade', pa.string()),
+            ('data_cadastro', pa.string())
+        ])
+        with pq.ParquetWriter(destino, esquema) as escritor:
+            for lote in iterar_pokemons(tamanho_lote):
+                colunas = list(zip(*lote))
+                escritor.write_table(pa.Table.from_arrays(
+                    [pa.array(valores, type=campo.type) for valores, campo in zip(colunas, esquema)],
+                    schema=esquema
+                ))
+                total += len(lote)
+        return total
+
+    if formato not in ("csv", "jsonl"):
+        raise ValueError(f"Formato de exportação não suportado: {formato}")
+
+    texto = io.TextIOWrapper(destino, encoding="utf-8", newline="")
+    try:
+        if formato == "csv":
+            escritor_csv = csv.writer(texto)
+            escritor_csv.writerow(COLUNAS_EXPORTACAO)
+        for lote in iterar_pokemons(tamanho_lote):
+            if formato == "csv":
+                escritor_csv.writerows(lote)
+            else:
+                texto.writelines(
+                    json.dumps(dict(zip(COLUNAS_EXPORTACAO, linha)), ensure_ascii=False) + "\n"
+                    for linha in lote
+                )
+            total += len(lote)
+    finally:
+        texto.flush()
+        texto.detach()
+    return total
+
+def exportar_imagens_zip(destino):
+    """Grava em `destino` um zip com as imagens referenciadas pelos Pokémon e retorna quantas entraram"""
+    total = 0
+    with conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT imagem_path FROM pokemons WHERE imagem_path IS NOT NULL")
+        with zipfile.ZipFile(destino, "w", compression=zipfile.ZIP_STORED) as arquivo_zip:
+            while True:
+                lote = cursor.fetchmany(TAMANHO_LOTE_EXPORTACAO)
+                if not lote:
+                    break
+                for (imagem_path,) in lote:
+                    if os.path.isfile(imagem_path):
+                        arquivo_zip.write(imagem_path, arcname=imagem_path.replace(os.sep, "/"))
+                        total += 1
+    return total
+
+def gerar_exportacao_download(formato):
+    """Gera a exportação em memória e retorna seus bytes para o download_button
+
+    O download_button precisa do conteúdo inteiro; só a exportação pela linha
+    de comando (`exportar`), que grava direto no arquivo, mantém a memória constante.
+    """
+    saida = io.BytesIO()
+    if formato == "zip":
+        exportar_imagens_zip(saida)
+    else:
+        exportar_pokemons(saida, formato)
+    return saida.getvalue()
+
+def _cli_exportar(args):
+    formato = args.formato or os.path.splitext(args.arquivo)[1].lower().lstrip(".")
+    with open(args.arquivo, "wb") as destino:
+        total = exportar_pokemons(destino, formato, args.lote)
+    print(f"{total} Pokémon exportados para {args.arquivo}")
+
+    if args.imagens:
+        with open(args.imagens, "wb") as destino:
+            total_imagens = exportar_imagens_zip(destino)
+        print(f"{total_imagens} imagens exportadas para {args.imagens}")
+    return 0
+
+# Pesos aproximados da frequência de cada tipo nas Pokédex oficiais
+DISTRIBUICAO_TIPOS = {
+    "Água": 13, "Normal": 11, "Planta": 10, "Inseto": 8, "Psíquico": 7, "Fogo": 7,
+    "Pedra": 6, "Elétrico": 6, "Terrestre": 5, "Venenoso": 5, "Sombrio": 5, "Lutador": 4,
+    "Dragão": 4, "Fantasma": 4, "Aço": 4, "Gelo": 4, "Fada": 3, "Voador": 2
+}
+NOMES_BASE_SINTETICOS = [
+    "Pikachu", "Bulbasaur", "Charmander", "Squirtle", "Eevee", "Magikarp", "Meowth",
+    "Gengar", "Onix", "Snorlax", "Psyduck", "Machop", "Geodude", "Jigglypuff", "Dratini"
+]
+PROPORCAO_SEGUNDO_TIPO = 0.45
+
+def _imagens_de_exemplo():
+    """Retorna as imagens de exemplo que acompanham o projeto"""
+    pasta = os.path.dirname(os.path.abspath(__file__))
+    return sorted(
+        caminho for extensao in ("jpg", "jpeg", "png", "gif")
+        for caminho in glob.glob(os.path.join(pasta, f"*.{extensao}"))
+    )
+
+def gerar_dados_sinteticos(total_treinadores, total_pokemons, semente=42):
+    """Acrescenta treinadores e Pokémon sintéticos ao banco, de forma reprodutível pela semente
+
+    Os tipos seguem DISTRIBUICAO_TIPOS e as imagens são as de exemplo do
+    projeto, gravadas uma única vez no armazenamento por conteúdo.
+    """
+    aleatorio = random.Random(semente)
+    tipos = list(DISTRIBUICAO_TIPOS)
+    pesos = list(DISTRIBUICAO_TIPOS.values())
+
+    imagens = []
+    for caminho in _imagens_de_exemplo():
+        with open(caminho, "rb") as arquivo:
+            imagens.append(armazenar_conteudo(arquivo, caminho))
+
+    with conexao_escrita() as conn:
+        conn.executemany(
+            "INSERT INTO treinadores (nome, cidade) VALUES (?, ?)",
+            ((f"Treinador {aleatorio.randrange(10 ** 6):06d}", f"Cidade {aleatorio.randrange(200):03d}")
+             for _ in range(total_treinadores))
+        )
+    with conexao_leitura() as conn:
+        ids_treinadores = [row[0] for row in conn.execute("SELECT id FROM treinadores")]
+
+    def pokemons():
+        for _ in range(total_pokemons):
+            tipo1, tipo2 = aleatorio.choices(tipos, weights=pesos, k=2)
+            if tipo2 == tipo1 or aleatorio.random() > PROPORCAO_SEGUNDO_TIPO:
+                tipo2 = None
+            yield (
+                f"{aleatorio.choice(NOMES_BASE_SINTETICOS)} {aleatorio.randrange(10 ** 6):06d}",
+                tipo1,
+                tipo2,
+                aleatorio.choice(ids_treinadores),
+                aleatorio.choice(imagens) if imagens else None
+            )
+
+    registros = pokemons()
+    while True:
+        lote = list(itertools.islice(registros, TAMANHO_LOTE_IMPORTACAO))
+        if not lote:
+            break
+        with conexao_escrita() as conn:
+            registrar_tipos(conn, tipos)
+            conn.executemany(SQL_INSERT_POKEMON, lote)
+
+def _cronometrar(funcao, repeticoes):
+    """Executa `funcao` sem cache de leitura e retorna mínimo e mediana em milissegundos"""
+    tempos = []
+    for _ in range(repeticoes):
+        st.cache_data.clear()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return {'min_ms': round(min(tempos), 3), 'mediana_ms': round(statistics.median(tempos), 3)}
+
+def _benchmark_funcoes(repeticoes, aleatorio):
+    """Mede as funções de dados da aplicação no banco atual"""
+    tipo = get_tipos_cadastrados()[0]
+    nome_tipo = get_catalogo_tipos()[tipo]
+    treinador_id = get_all_treinadores()[0][0]
+    exemplos = _imagens_de_exemplo()
+
+    def inserir_pokemon():
+        insert_pokemon("Benchmark", nome_tipo, None, treinador_id, None)
+
+    def salvar_imagem_nova():
+        with open(aleatorio.choice(exemplos), "rb") as arquivo:
+            conteudo = io.BytesIO(arquivo.read() + aleatorio.randbytes(16))
+        conteudo.name = "benchmark.gif"
+        salvar_imagem(conteudo)
+
+    medicoes = {
+        'get_all_pokemons': lambda: get_all_pokemons(),
+        'get_estatisticas': lambda: get_estatisticas(),
+        'get_resumo_pokedex': lambda: get_resumo_pokedex(),
+        'get_pokemons_por_treinador': lambda: get_pokemons_por_treinador(),
+        'get_contagem_tipos': lambda: get_contagem_tipos(),
+        'get_catalogo_tipos': lambda: get_catalogo_tipos(),
+        'pagina_sem_filtros': lambda: (contar_pokemons(), get_pagina_pokemons()),
+        'pagina_filtro_tipo': lambda: (contar_pokemons(filtro_tipo=tipo), get_pagina_pokemons(filtro_tipo=tipo)),
+        'pagina_filtro_treinador': lambda: (
+            contar_pokemons(filtro_treinador_id=treinador_id),
+            get_pagina_pokemons(filtro_treinador_id=treinador_id)
+        ),
+        'pagina_busca_textual': lambda: (contar_pokemons(filtro_nome="pika"), get_pagina_pokemons(filtro_nome="pika")),
+        'pagina_busca_aproximada': lambda: (
+            contar_pokemons(filtro_nome="pikachuu", busca_aproximada=True),
+            get_pagina_pokemons(filtro_nome="pikachuu", busca_aproximada=True)
+        ),
+        'insert_pokemon': inserir_pokemon,
+    }
+    if exemplos:
+        medicoes['salvar_imagem'] = salvar_imagem_nova
+
+    return {nome: _cronometrar(funcao, repeticoes) for nome, funcao in medicoes.items()}
+
+def _benchmark_paginas(script, repeticoes):
+    """Mede uma execução headless de cada página do menu com o AppTest do Streamlit"""
+    from streamlit.testing.v1 import AppTest
+
+    resultado = {}
+    for pagina in PAGINAS:
+        app = AppTest.from_file(script, default_timeout=600)
+        app.run()
+        tempos = []
+        for _ in range(repeticoes):
+            st.cache_data.clear()
+            inicio = time.perf_counter()
+            app.sidebar.radio[0].set_value(pagina).run()
+            tempos.append((time.perf_counter() - inicio) * 1000)
+        if app.exception:
+            raise RuntimeError(f"Erro ao executar a página {pagina}: {app.exception[0].value}")
+        resultado[pagina] = {'min_ms': round(min(tempos), 3), 'mediana_ms': round(statistics.median(tempos), 3)}
+    return resultado
+
+def _benchmark_partida(script, repeticoes):
+    """Mede a partida a frio: um interpretador novo executando a Página Inicial
+
+    Inclui importações, inicialização do banco e a primeira execução do
+    script; informa também se o pandas chegou a ser importado.
+    """
+    codigo = (
+        "import runpy, sys, time; inicio = time.perf_counter(); "
+        f"runpy.run_path({script!r}); "
+        "print(time.perf_counter() - inicio, 'pandas' in sys.modules)"
+    )
+    tempos = []
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, "-c", codigo], capture_output=True, text=True, check=True
+        ).stdout.split()
+        tempos.append(float(saida[-2]) * 1000)
+    return {
+        'min_ms': round(min(tempos), 3),
+        'mediana_ms': round(statistics.median(tempos), 3),
+        'importa_pandas': saida[-1] == "True"
+    }
+
+def executar_benchmark(escalas, pokemons_por_treinador=50, semente=42, repeticoes=3, paginas=True):
+    """Mede as funções de dados e as páginas em bancos sintéticos de tamanho crescente
+
+    Roda em um diretório temporário, acrescentando registros ao mesmo banco
+    até atingir cada escala. Retorna o relatório pronto para JSON.
+    """
+    script = os.path.abspath(__file__)
+    diretorio_original = os.getcwd()
+    diretorio = tempfile.mkdtemp(prefix="pokedex_benchmark_")
+    aleatorio = random.Random(semente)
+    relatorio = {
+        'python': sys.version.split()[0],
+        'sqlite': sqlite3.sqlite_version,
+        'streamlit': st.__version__,
+        'semente': semente,
+        'repeticoes': repeticoes,
+        'escalas': []
+    }
+
+    try:
+        os.chdir(diretorio)
+        init_database()
+        create_upload_folder()
+
+        total_atual = 0
+        for total_pokemons in sorted(escalas):
+            inicio = time.perf_counter()
+            novos = total_pokemons - total_atual
+            gerar_dados_sinteticos(max(1, novos // pokemons_por_treinador), novos, aleatorio.randrange(2 ** 32))
+            total_atual = total_pokemons
+            escala = {
+                'pokemons': total_pokemons,
+                'treinadores': get_estatisticas()['total_treinadores'],
+                'geracao_s': round(time.perf_counter() - inicio, 3),
+                'funcoes': _benchmark_funcoes(repeticoes, aleatorio)
+            }
+            if paginas:
+                escala['partida_a_frio'] = _benchmark_partida(script, repeticoes)
+                escala['paginas'] = _benchmark_paginas(script, repeticoes)
+            relatorio['escalas'].append(escala)
+            print(f"Escala {total_pokemons} concluída", file=sys.stderr)
+    finally:
+        os.chdir(diretorio_original)
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+    return relatorio
+
+def _cli_benchmark(args):
+    relatorio = executar_benchmark(
+        args.escalas, args.pokemons_por_treinador, args.semente, args.repeticoes, not args.sem_paginas
+    )
+    saida = json.dumps(relatorio, ensure_ascii=False, indent=2)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            arquivo.write(saida + "\n")
+    else:
+        print(saida)
+    return 0
+
+def _cli_importar(args):
+    formato = args.formato or formato_por_nome(args.arquivo)
+    with open(args.arquivo, encoding="utf-8-sig", newline="") as arquivo:
+        relatorio = importar_registros(ler_registros(arquivo, formato), args.tipo, args.lote, args.imagens)
+
+    print(f"{relatorio['inseridos']} {args.tipo} importados, "
+          f"{relatorio['total_rejeitados']} rejeitados em {relatorio['segundos']:.2f}s "
+          f"({relatorio['registros_por_segundo']:.0f} registros/s)")
+    for numero, motivo in relatorio['rejeitados']:
+        print(f"  linha {numero}: {motivo}", file=sys.stderr)
+    return 0 if not relatorio['total_rejeitados'] else 1
+
+def publicar_imagens():
+    """Publica todas as imagens referenciadas e suas miniaturas; retorna (publicadas, falhas)"""
+    with conexao_leitura() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT imagem_path FROM pokemons WHERE imagem_path IS NOT NULL")
+        caminhos = [row[0] for row in cursor.fetchall()]
+
+    publicadas = falhas = 0
+    for imagem_path in caminhos:
+        if not os.path.exists(imagem_path):
+            continue
+        if publicar_imagem(imagem_path):
+            publicadas += 1
+        else:
+            falhas += 1
+    return publicadas, falhas
+
+def _cli_publicar_imagens(args):
+    publicadas, falhas = publicar_imagens()
+    print(f"{publicadas} imagens publicadas, {falhas} falhas")
+    return 0 if not falhas else 1
+
+def _cli_coletar_imagens(args):
+    removidos = coletar_imagens_orfas(args.prazo)
+    print(f"{removidos} imagens órfãs removidas")
+    return 0
+
+def executar_cli(argv):
+    """Ponto de entrada de linha de comando (python app.py <comando> ...)"""
+    parser = argparse.ArgumentParser(prog="app.py", description="Ferramentas de linha de comando da Pokédex")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    importar = comandos.add_parser("importar", help="Importa treinadores ou Pokémon de um arquivo CSV/JSONL")
+    importar.add_argument("tipo", choices=["treinadores", "pokemons"])
+    importar.add_argument("arquivo")
+    importar.add_argument("--formato", choices=["csv", "jsonl"], help="Padrão: deduzido pela extensão")
+    importar.add_argument("--lote", type=int, default=TAMANHO_LOTE_IMPORTACAO, help="Registros por transação")
+    importar.add_argument("--imagens", metavar="DIRETORIO",
+                          help="Diretório de onde a coluna `imagem` pode ler arquivos (padrão: nenhum)")
+    importar.set_defaults(executar=_cli_importar)
+
+    exportar = comandos.add_parser("exportar", help="Exporta a Pokédex para CSV, JSONL ou Parquet")
+    exportar.add_argument("arquivo")
+    exportar.add_argument("--formato", choices=list(FORMATOS_EXPORTACAO), help="Padrão: deduzido pela extensão")
+    exportar.add_argument("--imagens", metavar="ARQUIVO_ZIP", help="Também gera um zip com as imagens")
+    exportar.add_argument("--lote", type=int, default=TAMANHO_LOTE_EXPORTACAO, help="Linhas por fetchmany")
+    exportar.set_defaults(executar=_cli_exportar)
+
+    coletar = comandos.add_parser("coletar-imagens", help="Remove as imagens que nenhum Pokémon referencia")
+    coletar.add_argument("--prazo", type=int, default=PRAZO_COLETA_SEGUNDOS,
+                         help="Mantém arquivos modificados há menos desses segundos")
+    coletar.set_defaults(executar=_cli_coletar_imagens)
+
+    publicar = comandos.add_parser("publicar-imagens",
+                                   help="Envia ao armazenamento (POKEDEX_IMAGENS_URL) as imagens ainda não publicadas")
+    publicar.set_defaults(executar=_cli_publicar_imagens)
+
+    benchmark = comandos.add_parser("benchmark", help="Mede o desempenho em bancos sintéticos e gera um JSON")
+    benchmark.add_argument("--escalas", type=int, nargs="+", default=[1000, 100000, 1000000],
+                           help="Quantidades de Pokémon a medir")
+    benchmark.add_argument("--pokemons-por-treinador", type=int, default=50)
+    benchmark.add_argument("--semente", type=int, default=42)
+    benchmark.add_argument("--repeticoes", type=int, default=3)
+    benchmark.add_argument("--sem-paginas", action="store_true", help="Não mede as páginas com o AppTest")
+    benchmark.add_argument("--saida", help="Arquivo JSON de saída (padrão: saída padrão)")
+    benchmark.set_defaults(executar=_cli_benchmark, usa_banco_local=False)
 
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS treinadores (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome TEXT NOT NULL,
-            cidade TEXT NOT NULL,
-            data_cadastro TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+    args = parser.parse_args(argv)
+    if getattr(args, "usa_banco_local", True):
+        init_database()
+        create_upload_folder()
+    return args.executar(args)
 
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS pokemons (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nome TEXT NOT NULL,
-            tipo1 TEXT NOT NULL,
-            tipo2 TEXT,
-            treinador_id INTEGER NOT NULL,
-            imagem_path TEXT,
-            data_cadastro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (treinador_id) REFERENCES treinadores (id)
-        )
-    ''')
-    
-    conn.commit()
-    conn.close()
+if __name__ == "__main__" and not st.runtime.exists():
+    sys.exit(executar_cli(sys.argv[1:]))
 
-def create_upload_folder():
-    """Cria o diretório para armazenar as imagens"""
-    if not os.path.exists("uploads"):
-        os.makedirs("uploads")
+@st.cache_resource
+def inicializar_aplicacao():
+    """Prepara o banco e as pastas e retoma as imagens pendentes uma única vez por processo
 
-def get_connection():
-    """Retorna uma conexão com o banco de dados"""
-    return sqlite3.connect('pokedex.db')
+    A retomada roda antes de qualquer página, para não disputar os envios
+    novos. A coleta de imagens órfãs percorre todo o UPLOADS_DIR, então roda
+    na fila de imagens em vez de atrasar a primeira página (ou via `coletar-imagens`).
+    """
+    with medir("inicializacao", "bootstrap"):
+        init_database()
+        create_upload_folder()
+        retomar_imagens_pendentes()
+    get_fila_imagens().submit(coletar_imagens_orfas)
 
-def get_all_treinadores():
-    """Retorna todos os treinadores cadastrados"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, nome, cidade FROM treinadores ORDER BY nome")
-    treinadores = cursor.fetchall()
-    conn.close()
-    return treinadores
+def iniciar_acompanhamento(pagina):
+    """Posiciona o acompanhamento de alterações da sessão no fim do log ao abrir a página"""
+    if st.session_state.get('acompanhamento_pagina') != pagina:
+        st.session_state.acompanhamento_pagina = pagina
+        st.session_state.acompanhamento_ultima = get_ultima_alteracao()
+        st.session_state.acompanhamento_novos = {}
 
-def get_treinadores_dict():
-    """Retorna dicionário de treinadores para selectbox"""
-    treinadores = get_all_treinadores()
-    return {f"{t[1]} - {t[2]}": t[0] for t in treinadores}
+def ler_novas_alteracoes():
+    """Lê as alterações ainda não vistas pela sessão e avança a posição dela no log
 
-def insert_treinador(nome, cidade):
-    """Insere um novo treinador no banco"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            "INSERT INTO treinadores (nome, cidade) VALUES (?, ?)",
-            (nome, cidade)
-        )
-        conn.commit()
-        return True, "Treinador cadastrado com sucesso!"
-    except sqlite3.Error as e:
-        return False, f"Erro ao cadastrar treinador: {e}"
-    finally:
-        conn.close()
+    Se houver mais que LIMITE_ALTERACOES_POR_CONSULTA (uma importação, por
+    exemplo), pula para o fim do log e retorna None: só as métricas são
+    atualizadas.
+    """
+    alteracoes = get_alteracoes(st.session_state.acompanhamento_ultima, LIMITE_ALTERACOES_POR_CONSULTA + 1)
+    if not alteracoes:
+        return []
+    if len(alteracoes) > LIMITE_ALTERACOES_POR_CONSULTA:
+        st.session_state.acompanhamento_ultima = get_ultima_alteracao()
+        alteracoes = None
+    else:
+        st.session_state.acompanhamento_ultima = alteracoes[-1][0]
+    registrar_alteracao_vista(st.session_state.acompanhamento_ultima)
+    return alteracoes
 
-def salvar_imagem(uploaded_file):
-    """Salva a imagem no diretório uploads e retorna o caminho"""
-    if uploaded_file is not None:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        filename = f"{timestamp}_{uploaded_file.name}"
-        filepath = os.path.join("uploads", filename)
-        
-        with open(filepath, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        
-        return filepath
-    return None
+@st.fragment(run_every=INTERVALO_ATUALIZACAO_SEGUNDOS)
+def painel_pokedex_ao_vivo(vazia=False):
+    """Métricas da Pokédex e cartões dos novos cadastros, atualizados pelo log de alterações
 
-def insert_pokemon(nome, tipo1, tipo2, treinador_id, imagem_path):
-    """Insere um novo Pokémon no banco"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
-            """INSERT INTO pokemons 
-            (nome, tipo1, tipo2, treinador_id, imagem_path) 
-            VALUES (?, ?, ?, ?, ?)""",
-            (nome, tipo1, tipo2, treinador_id, imagem_path)
-        )
-        conn.commit()
-        return True, "Pokémon cadastrado com sucesso!"
-    except sqlite3.Error as e:
-        return False, f"Erro ao cadastrar Pokémon: {e}"
-    finally:
-        conn.close()
+    Com `vazia`, a página foi montada sem Pokémon: o primeiro cadastro de
+    outra sessão reexecuta a página inteira, para exibir a lista e os filtros.
+    """
+    alteracoes = ler_novas_alteracoes()
+    novos = st.session_state.acompanhamento_novos
+    if alteracoes:
+        buscar = set()
+        for _, tabela, registro_id, operacao in alteracoes:
+            if tabela != "pokemons":
+                continue
+            if operacao == "delete":
+                novos.pop(registro_id, None)
+                buscar.discard(registro_id)
+            elif operacao == "insert" or registro_id in novos:
+                buscar.add(registro_id)
+        for pokemon in get_pokemons_por_id(buscar):
+            novos[pokemon[0]] = pokemon
+        for pokemon_id in sorted(novos)[:-MAX_NOVOS_EXIBIDOS]:
+            del novos[pokemon_id]
 
-def get_all_pokemons():
-    """Retorna todos os Pokémon com informações dos treinadores"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT p.id, p.nome, p.tipo1, p.tipo2, p.imagem_path,
-               t.nome as treinador_nome, t.cidade as treinador_cidade,
-               p.data_cadastro
-        FROM pokemons p
-        JOIN treinadores t ON p.treinador_id = t.id
-        ORDER BY p.nome
-    """)
-    pokemons = cursor.fetchall()
-    conn.close()
-    return pokemons
+    resumo = get_resumo_pokedex()
+    if vazia and resumo['total_pokemons']:
+        st.rerun()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Total de Pokémon", resumo['total_pokemons'])
+    with col2:
+        st.metric("Tipos Diferentes", len(get_tipos_cadastrados()))
+    with col3:
+        st.metric("Treinadores", resumo['total_treinadores'])
+    with col4:
+        st.metric("Com 2 Tipos", resumo['com_dois_tipos'])
 
-def get_estatisticas():
-    """Retorna estatísticas do sistema"""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT COUNT(*) FROM treinadores")
-    total_treinadores = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM pokemons")
-    total_pokemons = cursor.fetchone()[0]
-    
-    cursor.execute("""
-        SELECT t.nome, COUNT(p.id) as total 
-        FROM treinadores t 
-        LEFT JOIN pokemons p ON t.id = p.treinador_id 
-        GROUP BY t.id 
-        ORDER BY total DESC 
-        LIMIT 1
-    """)
-    treinador_mais_pokemons = cursor.fetchone()
+    if novos:
+        with st.expander(f"Novos cadastros ({len(novos)})", expanded=True):
+            st.html(html_grade_pokemons([novos[pokemon_id] for pokemon_id in sorted(novos, reverse=True)]))
+
+@st.fragment(run_every=INTERVALO_ATUALIZACAO_SEGUNDOS)
+def painel_estatisticas_ao_vivo():
+    """Métricas principais das estatísticas, atualizadas quando o log registra alterações"""
+    ler_novas_alteracoes()
+    stats = get_estatisticas()
     
-    conn.close()
+    st.metric("Total de Treinadores", stats['total_treinadores'])
+    st.metric("Total de Pokémon", stats['total_pokemons'])
     
-    return {
-        'total_treinadores': total_treinadores,
-        'total_pokemons': total_pokemons,
-        'treinador_mais_pokemons': treinador_mais_pokemons
-    }
+    if stats['treinador_mais_pokemons']:
+        st.info(f"""
+        **Treinador Destaque:**
+        {stats['treinador_mais_pokemons'][0]}
+        com {stats['treinador_mais_pokemons'][1]} Pokémon
+        """)
 
-init_database()
-create_upload_folder()
+if INSTRUMENTACAO_ATIVA:
+    get_instrumentacao().iniciar_execucao(INICIO_SCRIPT)
+    get_instrumentacao().registrar("inicializacao", "importacoes", FIM_IMPORTACOES - INICIO_SCRIPT)
+
+st.set_page_config(
+    page_title="Pokedex",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+st.title("POKEDEX COMPLETA")
+st.subheader("Daniel Costa, Matheus Willian e Kauã Guedes 2°D")
+st.markdown("---")
+
+if INSTRUMENTACAO_ATIVA:
+    get_instrumentacao().registrar("inicializacao", "primeiro_elemento", time.perf_counter() - INICIO_SCRIPT)
+
+inicializar_aplicacao()
 
 st.sidebar.title("Navegação")
 menu = st.sidebar.radio(
     "Selecione uma opção:",
-    ["Página Inicial", "Gerenciar Treinadores", "Cadastrar Pokémon", "Visualizar Pokédex", "Estatísticas"]
+    PAGINAS
 )
+# O tempo da página é registrado mesmo quando a execução termina em st.rerun() ou st.stop()
+try:
+    iniciar_acompanhamento(menu)
 
-st.sidebar.markdown("---")
+    st.sidebar.markdown("---")
 
-if menu == "Página Inicial":
-    st.header("Bem-vindo à Pokédex Completa!")
+    if menu == "Página Inicial":
+        st.header("Bem-vindo à Pokédex Completa!")
     
-    col1, col2 = st.columns([2, 1])
+        col1, col2 = st.columns([2, 1])
     
-    with col1:
-        st.markdown("""
-        ### Sobre o Projeto
-        
-        Este sistema foi desenvolvido como parte da disciplina de **Desenvolvimento de Sistemas**
-        e transforma uma Pokédex simples em um sistema robusto que:
-        
-        - **Gerencia Treinadores** 
-        - **Cadastra Pokémon**   
-        - **Associa Pokémon a Treinadores** 
-        - **Armazena e exibe imagens** 
-        - **Apresenta relatórios completos** 
-        
-        ### Funcionalidades Principais
-        
-        1. **Gerenciamento de Treinadores**
-           - Cadastro de novos treinadores
-           - Registro da cidade de origem
-           - Listagem completa
-        
-        2. **Cadastro de Pokémon** 
-           - Associação obrigatória com treinador
-           - Upload de imagem
-           - Registro de tipos (Tipo 1 e Tipo 2)
-        
-        3. **Visualização da Pokédex**
-           - Listagem completa de Pokémon
-           - Exibição de imagens
-           - Informações do treinador responsável
-        """)
+        with col1:
+            st.markdown("""
+            ### Sobre o Projeto
+        
+            Este sistema foi desenvolvido como parte da disciplina de **Desenvolvimento de Sistemas**
+            e transforma uma Pokédex simples em um sistema robusto que:
+        
+            - **Gerencia Treinadores** 
+            - **Cadastra Pokémon**   
+            - **Associa Pokémon a Treinadores** 
+            - **Armazena e exibe imagens** 
+            - **Apresenta relatórios completos** 
+        
+            ### Funcionalidades Principais
+        
+            1. **Gerenciamento de Treinadores**
+               - Cadastro de novos treinadores
+               - Registro da cidade de origem
+               - Listagem completa
+        
+            2. **Cadastro de Pokémon** 
+               - Associação obrigatória com treinador
+               - Upload de imagem
+               - Registro de tipos (Tipo 1 e Tipo 2)
+        
+            3. **Visualização da Pokédex**
+               - Listagem completa de Pokémon
+               - Exibição de imagens
+               - Informações do treinador responsável
+            """)
     
-    with col2:
-        stats = get_estatisticas()
+        with col2:
+            stats = get_estatisticas()
         
-        st.success("### Dashboard Rápido")
-        st.metric("Treinadores Cadastrados", stats['total_treinadores'])
-        st.metric("Pokémon Registrados", stats['total_pokemons'])
+            st.success("### Dashboard Rápido")
+            st.metric("Treinadores Cadastrados", stats['total_treinadores'])
+            st.metric("Pokémon Registrados", stats['total_pokemons'])
         
-        if stats['treinador_mais_pokemons']:
-            st.info(f"**Treinador com mais Pokémon:**\n{stats['treinador_mais_pokemons'][0]} ({stats['treinador_mais_pokemons'][1]})")
+            if stats['treinador_mais_pokemons']:
+                st.info(f"**Treinador com mais Pokémon:**\n{stats['treinador_mais_pokemons'][0]} ({stats['treinador_mais_pokemons'][1]})")
         
-        st.markdown("---")
-        st.warning("""
-        **Atenção**
+            st.markdown("---")
+            st.warning("""
+            **Atenção**
         
-        Para cadastrar Pokémon, é necessário ter pelo menos **um treinador** cadastrado no sistema.
-        """)
+            Para cadastrar Pokémon, é necessário ter pelo menos **um treinador** cadastrado no sistema.
+            """)
 
-elif menu == "Gerenciar Treinadores":
-    st.header("Gerenciamento de Treinadores")
+    elif menu == "Gerenciar Treinadores":
+        import pandas as pd
     
-    tab1, tab2 = st.tabs(["Cadastrar Novo Treinador", "Lista de Treinadores Cadastrados"])
+        st.header("Gerenciamento de Treinadores")
     
-    with tab1:
-        st.subheader("Cadastro de Treinador")
+        tab1, tab2 = st.tabs(["Cadastrar Novo Treinador", "Lista de Treinadores Cadastrados"])
+    
+        with tab1:
+            st.subheader("Cadastro de Treinador")
         
-        with st.form("form_treinador", clear_on_submit=True):
-            col1, col2 = st.columns(2)
+            with st.form("form_treinador", clear_on_submit=True):
+                col1, col2 = st.columns(2)
             
-            with col1:
-                nome = st.text_input(
-                    "**Nome do Treinador**",
-                    placeholder="Ex: Ash Ketchum",
-                    help="Digite o nome completo do treinador"
-                )
+                with col1:
+                    nome = st.text_input(
+                        "**Nome do Treinador**",
+                        placeholder="Ex: Ash Ketchum",
+                        help="Digite o nome completo do treinador"
+                    )
             
-            with col2:
-                cidade = st.text_input(
-                    "**Cidade de Origem**", 
-                    placeholder="Ex: Cidade de Pallet",
-                    help="Cidade natal do treinador"
-                )
+                with col2:
+                    cidade = st.text_input(
+                        "**Cidade de Origem**", 
+                        placeholder="Ex: Cidade de Pallet",
+                        help="Cidade natal do treinador"
+                    )
             
-            submitted = st.form_submit_button("Cadastrar Treinador", use_container_width=True)
+                submitted = st.form_submit_button("Cadastrar Treinador", use_container_width=True)
             
-            if submitted:
-                if nome.strip() and cidade.strip():
-                    success, message = insert_treinador(nome.strip(), cidade.strip())
-                    if success:
-                        st.success(f"{message}")
+                if submitted:
+                    if nome.strip() and cidade.strip():
+                        success, message = insert_treinador(nome.strip(), cidade.strip())
+                        if success:
+                            st.success(f"{message}")
+                        else:
+                            st.error(f"{message}")
                     else:
-                        st.error(f"{message}")
-                else:
-                    st.warning("Preencha todos os campos obrigatórios!")
+                        st.warning("Preencha todos os campos obrigatórios!")
     
-    with tab2:
-        st.subheader("Treinadores Cadastrados")
+        with tab2:
+            st.subheader("Treinadores Cadastrados")
         
-        treinadores = get_all_treinadores()
+            treinadores = get_all_treinadores()
         
-        if treinadores:
-            df_treinadores = pd.DataFrame(
-                treinadores,
-                columns=['ID', 'Nome', 'Cidade']
-            )
+            if treinadores:
+                df_treinadores = pd.DataFrame(
+                    treinadores,
+                    columns=['ID', 'Nome', 'Cidade']
+                )
             
-            st.dataframe(
-                df_treinadores,
-                use_container_width=True,
-                hide_index=True
-            )
+                st.dataframe(
+                    df_treinadores,
+                    use_container_width=True,
+                    hide_index=True
+                )
             
-            st.subheader("Estatísticas por Treinador")
+                st.subheader("Ranking de Treinadores")
             
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT t.nome, t.cidade, COUNT(p.id) as total_pokemons
-                FROM treinadores t
-                LEFT JOIN pokemons p ON t.id = p.treinador_id
-                GROUP BY t.id
-                ORDER BY total_pokemons DESC
-            """)
-            stats_treinadores = cursor.fetchall()
-            conn.close()
+                # Pilha com a chave (total, id) onde cada página do ranking começa
+                if 'ranking_paginas' not in st.session_state:
+                    st.session_state.ranking_paginas = [None]
+                paginas_ranking = st.session_state.ranking_paginas
             
-            for treinador in stats_treinadores:
-                col1, col2, col3 = st.columns([3, 2, 1])
-                with col1:
-                    st.write(f"**{treinador[0]}**")
-                with col2:
-                    st.write(f"_{treinador[1]}_")
-                with col3:
-                    st.metric("Pokémon", treinador[2])
+                pagina_ranking = get_ranking_treinadores(apos=paginas_ranking[-1], limite=TREINADORES_POR_PAGINA + 1)
+                tem_proxima_ranking = len(pagina_ranking) > TREINADORES_POR_PAGINA
+                pagina_ranking = pagina_ranking[:TREINADORES_POR_PAGINA]
+                lider = get_estatisticas()['treinador_mais_pokemons']
+                maior_total = lider[1] if lider and lider[1] else 1
+            
+                posicao_inicial = (len(paginas_ranking) - 1) * TREINADORES_POR_PAGINA
+                for posicao, treinador in enumerate(pagina_ranking, start=posicao_inicial + 1):
+                    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+                    with col1:
+                        st.write(f"**{posicao}º {treinador[1]}**")
+                    with col2:
+                        st.write(f"_{treinador[2]}_")
+                    with col3:
+                        st.metric("Pokémon", treinador[3])
+                    with col4:
+                        if st.button("Detalhes", key=f"detalhes_treinador_{treinador[0]}", use_container_width=True):
+                            st.session_state.treinador_detalhe = treinador[0]
                 
-                st.progress(min(treinador[2] / 10, 1.0) if treinador[2] > 0 else 0)
-        else:
-            st.info("""
-            ## Nenhum treinador cadastrado ainda!
+                    st.progress(treinador[3] / maior_total)
             
-            Use a aba **Cadastrar Novo Treinador** para adicionar o primeiro treinador ao sistema.
-            """)
+                nav1, nav2, nav3 = st.columns([1, 2, 1])
+                with nav1:
+                    if st.button("Anterior", key="ranking_anterior", disabled=len(paginas_ranking) == 1, use_container_width=True):
+                        paginas_ranking.pop()
+                        st.rerun()
+                with nav2:
+                    st.caption(f"Página {len(paginas_ranking)} do ranking")
+                with nav3:
+                    if st.button("Próxima", key="ranking_proxima", disabled=not tem_proxima_ranking, use_container_width=True):
+                        ultimo = pagina_ranking[-1]
+                        paginas_ranking.append((ultimo[3], ultimo[0]))
+                        st.rerun()
+            
+                treinador_detalhe = get_treinador(st.session_state.get('treinador_detalhe'))
+                if treinador_detalhe:
+                    st.markdown("---")
+                    st.subheader(f"{treinador_detalhe[1]} ({treinador_detalhe[2]})")
+                
+                    col1, col2, col3 = st.columns([2, 2, 1])
+                    with col1:
+                        st.metric("Pokémon", treinador_detalhe[4])
+                    with col2:
+                        st.metric("Cadastrado em", str(treinador_detalhe[3])[:10])
+                    with col3:
+                        if st.button("Fechar", key="fechar_detalhe_treinador", use_container_width=True):
+                            del st.session_state.treinador_detalhe
+                            st.rerun()
+                
+                    # Pilha de páginas dos Pokémon, reiniciada a cada troca de treinador
+                    if st.session_state.get('detalhe_treinador_id') != treinador_detalhe[0]:
+                        st.session_state.detalhe_treinador_id = treinador_detalhe[0]
+                        st.session_state.detalhe_paginas = [None]
+                    paginas_detalhe = st.session_state.detalhe_paginas
+                
+                    pagina_detalhe = get_pagina_pokemons(
+                        filtro_treinador_id=treinador_detalhe[0],
+                        apos=paginas_detalhe[-1],
+                        limite=POKEMONS_POR_PAGINA + 1
+                    )
+                    tem_proxima_detalhe = len(pagina_detalhe) > POKEMONS_POR_PAGINA
+                    pagina_detalhe = pagina_detalhe[:POKEMONS_POR_PAGINA]
+                
+                    if pagina_detalhe:
+                        st.html(html_grade_pokemons(pagina_detalhe))
+                    
+                        total_paginas_detalhe = max(1, -(-treinador_detalhe[4] // POKEMONS_POR_PAGINA))
+                        nav1, nav2, nav3 = st.columns([1, 2, 1])
+                        with nav1:
+                            if st.button("Anterior", key="detalhe_anterior", disabled=len(paginas_detalhe) == 1, use_container_width=True):
+                                paginas_detalhe.pop()
+                                st.rerun()
+                        with nav2:
+                            st.caption(f"Página {len(paginas_detalhe)} de {total_paginas_detalhe}")
+                        with nav3:
+                            if st.button("Próxima", key="detalhe_proxima", disabled=not tem_proxima_detalhe, use_container_width=True):
+                                ultimo = pagina_detalhe[-1]
+                                paginas_detalhe.append((ultimo[9], ultimo[0]))
+                                st.rerun()
+                    else:
+                        st.info("Este treinador ainda não tem Pokémon cadastrados.")
+            else:
+                st.info("""
+                ## Nenhum treinador cadastrado ainda!
+            
+                Use a aba **Cadastrar Novo Treinador** para adicionar o primeiro treinador ao sistema.
+                """)
 
-elif menu == "Cadastrar Pokémon":
-    st.header("Cadastrar Novo Pokémon")
+    elif menu == "Cadastrar Pokémon":
+        import pandas as pd
+    
+        st.header("Cadastrar Novo Pokémon")
+    
+        tab_individual, tab_equipe, tab_lote = st.tabs(["Cadastro Individual", "Cadastro em Equipe", "Importação em Lote"])
     
-    treinadores_dict = get_treinadores_dict()
+        with tab_individual:
+            treinadores_dict = get_treinadores_dict()
     
-    if not treinadores_dict:
-        st.error("""
-        ## Atenção Necessária!
+            if not treinadores_dict:
+                st.error("""
+                ## Atenção Necessária!
         
-        **É necessário cadastrar pelo menos um treinador antes de registrar Pokémon!**
+                **É necessário cadastrar pelo menos um treinador antes de registrar Pokémon!**
         
-        ### Próximos passos:
-        1. Vá para **Gerenciar Treinadores**
-        2. Cadastre um treinador usando o formulário
-        3. Volte para esta página para cadastrar Pokémon
+                ### Próximos passos:
+                1. Vá para **Gerenciar Treinadores**
+                2. Cadastre um treinador usando o formulário
+                3. Volte para esta página para cadastrar Pokémon
         
-        Sem treinadores cadastrados, não é possível associar Pokémon!
-        """)
-    else:
-        with st.form("form_pokemon", clear_on_submit=True):
-            st.subheader("Informações do Pokémon")
+                Sem treinadores cadastrados, não é possível associar Pokémon!
+                """)
+            else:
+                with st.form("form_pokemon", clear_on_submit=True):
+                    st.subheader("Informações do Pokémon")
             
-            col1, col2 = st.columns(2)
+                    col1, col2 = st.columns(2)
             
-            with col1:
-                nome_pokemon = st.text_input(
-                    "**Nome do Pokémon**",
-                    placeholder="Ex: Pikachu",
-                    help="Nome do Pokémon"
-                )
+                    with col1:
+                        nome_pokemon = st.text_input(
+                            "**Nome do Pokémon**",
+                            placeholder="Ex: Pikachu",
+                            help="Nome do Pokémon"
+                        )
                 
-                tipo1 = st.text_input(
-                    "**Tipo Primário (Tipo 1)**",
-                    placeholder="Ex: Elétrico",
-                    help="Tipo principal do Pokémon"
-                )
+                        tipo1 = st.text_input(
+                            "**Tipo Primário (Tipo 1)**",
+                            placeholder="Ex: Elétrico",
+                            help="Tipo principal do Pokémon"
+                        )
                 
-                tipo2 = st.text_input(
-                    "**Tipo Secundário (Tipo 2)**",
-                    placeholder="Ex: Aço (opcional)",
-                    help="Tipo secundário (deixe em branco se não tiver)"
-                )
+                        tipo2 = st.text_input(
+                            "**Tipo Secundário (Tipo 2)**",
+                            placeholder="Ex: Aço (opcional)",
+                            help="Tipo secundário (deixe em branco se não tiver)"
+                        )
             
-            with col2:
-                treinador_options = list(treinadores_dict.keys())
-                treinador_selecionado = st.selectbox(
-                    "**Treinador Responsável**",
-                    options=treinador_options,
-                    help="Selecione o treinador responsável por este Pokémon",
-                    index=0
-                )
-                treinador_id = treinadores_dict[treinador_selecionado]
+                    with col2:
+                        treinador_options = list(treinadores_dict.keys())
+                        treinador_selecionado = st.selectbox(
+                            "**Treinador Responsável**",
+                            options=treinador_options,
+                            help="Selecione o treinador responsável por este Pokémon",
+                            index=0
+                        )
+                        treinador_id = treinadores_dict[treinador_selecionado]
                 
-                uploaded_file = st.file_uploader(
-                    "**Upload da Imagem do Pokémon**",
-                    type=['png', 'jpg', 'jpeg', 'gif'],
-                    help="Faça o upload de uma imagem do Pokémon (PNG, JPG, JPEG, GIF)"
-                )
+                        uploaded_file = st.file_uploader(
+                            "**Upload da Imagem do Pokémon**",
+                            type=['png', 'jpg', 'jpeg', 'gif'],
+                            help="Faça o upload de uma imagem do Pokémon (PNG, JPG, JPEG, GIF)"
+                        )
                 
-                if uploaded_file is not None:
-                    st.image(uploaded_file, caption="Pré-visualização da Imagem", width=200)
+                        if uploaded_file is not None:
+                            st.image(uploaded_file, caption="Pré-visualização da Imagem", width=200)
             
-            submitted = st.form_submit_button("Cadastrar Pokémon", use_container_width=True)
+                    submitted = st.form_submit_button("Cadastrar Pokémon", use_container_width=True)
             
-            if submitted:
-
-                if not nome_pokemon.strip():
-                    st.error("O nome do Pokémon é obrigatório!")
-                elif not tipo1.strip():
-                    st.error("O tipo primário é obrigatório!")
-                elif not treinador_selecionado:
-                    st.error("A seleção do treinador é obrigatória!")
-                elif not uploaded_file:
-                    st.error("O upload de imagem é obrigatório!")
-                else:
+                    if submitted:
+
+                        if not nome_pokemon.strip():
+                            st.error("O nome do Pokémon é obrigatório!")
+                        elif not tipo1.strip():
+                            st.error("O tipo primário é obrigatório!")
+                        elif not treinador_selecionado:
+                            st.error("A seleção do treinador é obrigatória!")
+                        elif not uploaded_file:
+                            st.error("O upload de imagem é obrigatório!")
+                        else:
 
-                    imagem_path = salvar_imagem(uploaded_file)
+                            success, message = cadastrar_pokemon_com_imagem(
+                                nome_pokemon.strip(),
+                                tipo1.strip(),
+                                tipo2.strip() if tipo2.strip() else None,
+                                treinador_id,
+                                uploaded_file
+                            )
                     
-                    if imagem_path:
-                        success, message = insert_pokemon(
-                            nome_pokemon.strip(),
-                            tipo1.strip(),
-                            tipo2.strip() if tipo2.strip() else None,
-                            treinador_id,
-                            imagem_path
-                        )
+                            if success:
+                                st.success(f"{message}")
+                                st.balloons()
                         
-                        if success:
-                            st.success(f"{message}")
-                            st.balloons()
-                            
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                st.info(f"""
-                                **Resumo do Cadastro:**
-                                - **Pokémon:** {nome_pokemon}
-                                - **Tipo 1:** {tipo1}
-                                - **Tipo 2:** {tipo2 if tipo2 else 'Nenhum'}
-                                - **Treinador:** {treinador_selecionado}
-                                """)
-                            with col2:
-                                if os.path.exists(imagem_path):
-                                    st.image(imagem_path, caption=nome_pokemon, width=150)
-                        else:
-                            st.error(f"{message}")
+                                col1, col2 = st.columns(2)
+                                with col1:
+                                    st.info(f"""
+                                    **Resumo do Cadastro:**
+                                    - **Pokémon:** {nome_pokemon}
+                                    - **Tipo 1:** {tipo1}
+                                    - **Tipo 2:** {tipo2 if tipo2 else 'Nenhum'}
+                                    - **Treinador:** {treinador_selecionado}
+                                    """)
+                                with col2:
+                                    st.image(uploaded_file, caption=nome_pokemon, width=150)
+                            else:
+                                st.error(f"{message}")
+    
+        with tab_equipe:
+            treinadores_equipe = get_treinadores_dict()
+        
+            if not treinadores_equipe:
+                st.error("É necessário cadastrar pelo menos um treinador antes de registrar Pokémon!")
+            else:
+                st.subheader("Equipe do Treinador")
+            
+                imagens_equipe = st.file_uploader(
+                    "**Imagens da equipe**",
+                    type=['png', 'jpg', 'jpeg', 'gif'],
+                    accept_multiple_files=True,
+                    help="Escolha a imagem de cada linha na tabela; sem escolha, usa o arquivo com o nome do Pokémon",
+                    key="imagens_equipe"
+                )
+            
+                with st.form("form_equipe", clear_on_submit=True):
+                    treinador_equipe = st.selectbox(
+                        "**Treinador Responsável**",
+                        options=list(treinadores_equipe.keys())
+                    )
+                
+                    equipe = st.data_editor(
+                        pd.DataFrame({
+                            'nome': [""] * LINHAS_EQUIPE,
+                            'tipo1': [""] * LINHAS_EQUIPE,
+                            'tipo2': [""] * LINHAS_EQUIPE,
+                            'imagem': [None] * LINHAS_EQUIPE
+                        }),
+                        column_config={
+                            'nome': st.column_config.TextColumn("Nome"),
+                            'tipo1': st.column_config.TextColumn("Tipo 1"),
+                            'tipo2': st.column_config.TextColumn("Tipo 2 (opcional)"),
+                            'imagem': st.column_config.SelectboxColumn(
+                                "Imagem",
+                                options=[arquivo.name for arquivo in imagens_equipe]
+                            )
+                        },
+                        num_rows="dynamic",
+                        use_container_width=True,
+                        hide_index=True
+                    )
+                
+                    submitted_equipe = st.form_submit_button("Cadastrar Equipe", use_container_width=True)
+            
+                if submitted_equipe:
+                    with st.spinner("Processando imagens da equipe..."):
+                        success, message, erros = cadastrar_equipe(
+                            treinadores_equipe[treinador_equipe],
+                            equipe.to_dict("records"),
+                            imagens_equipe
+                        )
+                
+                    if success:
+                        st.success(message)
+                        st.balloons()
                     else:
-                        st.error("Erro ao salvar a imagem!")
+                        st.error(message)
+                        if erros:
+                            st.dataframe(
+                                pd.DataFrame(erros, columns=['Linha', 'Motivo']),
+                                use_container_width=True,
+                                hide_index=True
+                            )
+    
+        with tab_lote:
+            st.subheader("Importação de Arquivo CSV/JSONL")
+            st.caption(
+                "Treinadores: colunas `nome` e `cidade`. "
+                "Pokémon: `nome`, `tipo1`, `tipo2` (opcional) e `treinador` "
+                "(nome, \"nome - cidade\" ou id)."
+            )
+        
+            tipo_importacao = st.radio(
+                "**Tipo de registro**",
+                ["pokemons", "treinadores"],
+                format_func=lambda tipo: "Pokémon" if tipo == "pokemons" else "Treinadores",
+                horizontal=True
+            )
+            arquivo_importacao = st.file_uploader(
+                "**Arquivo para importar**",
+                type=['csv', 'jsonl', 'ndjson'],
+                key="arquivo_importacao"
+            )
+        
+            if arquivo_importacao is not None and st.button("Importar", use_container_width=True):
+                texto = io.TextIOWrapper(arquivo_importacao, encoding="utf-8-sig", newline="")
+                with st.spinner("Importando registros..."):
+                    relatorio = importar_registros(
+                        ler_registros(texto, formato_por_nome(arquivo_importacao.name)),
+                        tipo_importacao
+                    )
+            
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Importados", relatorio['inseridos'])
+                with col2:
+                    st.metric("Rejeitados", relatorio['total_rejeitados'])
+                with col3:
+                    st.metric("Registros/s", f"{relatorio['registros_por_segundo']:.0f}")
+            
+                if relatorio['rejeitados']:
+                    st.warning("Algumas linhas foram rejeitadas:")
+                    st.dataframe(
+                        pd.DataFrame(relatorio['rejeitados'], columns=['Linha', 'Motivo']),
+                        use_container_width=True,
+                        hide_index=True
+                    )
+                else:
+                    st.success("Importação concluída sem rejeições!")
 
-elif menu == "Visualizar Pokédex":
-    st.header("Pokédex Completa")
+    elif menu == "Visualizar Pokédex":
+        st.header("Pokédex Completa")
     
-    pokemons = get_all_pokemons()
+        resumo = get_resumo_pokedex()
+        tipos = get_tipos_cadastrados()
     
-    if pokemons:
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Total de Pokémon", len(pokemons))
-        with col2:
-            tipos_unicos = len(set([p[2] for p in pokemons] + [p[3] for p in pokemons if p[3]]))
-            st.metric("Tipos Diferentes", tipos_unicos)
-        with col3:
-            treinadores_unicos = len(set([p[5] for p in pokemons]))
-            st.metric("Treinadores", treinadores_unicos)
-        with col4:
-            with_second_type = len([p for p in pokemons if p[3]])
-            st.metric("Com 2 Tipos", with_second_type)
-        
-        st.markdown("---")
-        
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            filter_nome = st.text_input("Filtrar por nome:", placeholder="Digite o nome do Pokémon...")
-        with col2:
-            tipos = sorted(list(set([p[2] for p in pokemons] + [p[3] for p in pokemons if p[3]])))
-            filter_tipo = st.selectbox("Filtrar por tipo:", ["Todos"] + tipos)
-        with col3:
-            treinadores = sorted(list(set([p[5] for p in pokemons])))
-            filter_treinador = st.selectbox("Filtrar por treinador:", ["Todos"] + treinadores)
-        
-        pokemons_filtrados = pokemons
-        if filter_nome:
-            pokemons_filtrados = [p for p in pokemons_filtrados if filter_nome.lower() in p[1].lower()]
-        if filter_tipo != "Todos":
-            pokemons_filtrados = [p for p in pokemons_filtrados if p[2] == filter_tipo or p[3] == filter_tipo]
-        if filter_treinador != "Todos":
-            pokemons_filtrados = [p for p in pokemons_filtrados if p[5] == filter_treinador]
-        
-        st.write(f"**Mostrando {len(pokemons_filtrados)} de {len(pokemons)} Pokémon**")
-        
-        cols = st.columns(3)
-        
-        for idx, pokemon in enumerate(pokemons_filtrados):
-            with cols[idx % 3]:
-                with st.container():
-                    st.markdown("---")
-                    
-                    st.subheader(f"#{pokemon[0]:03d} {pokemon[1]}")
-                    
-                    if pokemon[4] and os.path.exists(pokemon[4]):
-                        st.image(pokemon[4], use_container_width=True)
-                    else:
-                        st.warning("Imagem não encontrada")
-
-                    col_t1, col_t2 = st.columns(2)
-                    with col_t1:
-                        st.success(f"**{pokemon[2]}**")
-                    with col_t2:
-                        if pokemon[3]:
-                            st.info(f"**{pokemon[3]}**")
-                    
-                    st.write(f"**Treinador:** {pokemon[5]}")
-                    st.write(f"**Cidade:** {pokemon[6]}")
-                    st.caption(f"Cadastrado em: {pokemon[7][:10]}")
-                    
-                    st.markdown("")
-    else:
-        st.info("""
-        ## Nenhum Pokémon cadastrado ainda!
+        painel_pokedex_ao_vivo(vazia=not resumo['total_pokemons'])
         
-        ### Para começar:
-        1. Vá para **Gerenciar Treinadores** e cadastre um treinador
-        2. Depois use **Cadastrar Pokémon** para adicionar seu primeiro Pokémon
-        3. Volte aqui para visualizar toda a Pokédex!
+        if resumo['total_pokemons']:
+            with st.expander("Exportar Pokédex"):
+                col_formato, col_dados, col_imagens = st.columns(3)
+                with col_formato:
+                    formato_exportacao = st.selectbox("Formato:", list(FORMATOS_EXPORTACAO))
+                with col_dados:
+                    st.download_button(
+                        "Baixar dados",
+                        data=lambda: gerar_exportacao_download(formato_exportacao),
+                        file_name=f"pokedex.{formato_exportacao}",
+                        mime=FORMATOS_EXPORTACAO[formato_exportacao],
+                        on_click="ignore",
+                        use_container_width=True
+                    )
+                with col_imagens:
+                    st.download_button(
+                        "Baixar imagens (zip)",
+                        data=lambda: gerar_exportacao_download("zip"),
+                        file_name="pokedex_imagens.zip",
+                        mime="application/zip",
+                        on_click="ignore",
+                        use_container_width=True
+                    )
         
-        Lembre-se: É necessário ter treinadores cadastrados antes de adicionar Pokémon.
-        """)
+            st.markdown("---")
+        
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                filter_nome = st.text_input("Buscar:", placeholder="Nome, tipo, treinador ou cidade...")
+            with col2:
+                catalogo_tipos = get_catalogo_tipos()
+                filter_tipo = st.selectbox(
+                    "Filtrar por tipo:",
+                    [None] + tipos,
+                    format_func=lambda tipo_id: "Todos" if tipo_id is None else catalogo_tipos[tipo_id]
+                )
+            with col3:
+                treinadores_dict = get_treinadores_dict()
+                filter_treinador = st.selectbox("Filtrar por treinador:", ["Todos"] + list(treinadores_dict.keys()))
+        
+            filtros = {
+                'filtro_nome': filter_nome.strip() or None,
+                'filtro_tipo': filter_tipo,
+                'filtro_treinador_id': treinadores_dict.get(filter_treinador)
+            }
+        
+            # Pilha com a chave (ordem, id) onde cada página visitada começa
+            if st.session_state.get('pokedex_filtros') != filtros:
+                st.session_state.pokedex_filtros = dict(filtros)
+                st.session_state.pokedex_paginas = [None]
+            paginas = st.session_state.pokedex_paginas
+            # A busca por nome pagina pelo retrato tirado ao exibir a primeira página
+            if len(paginas) == 1:
+                st.session_state.pokedex_versao_busca = versao_dados()
+        
+            total_filtrados = contar_pokemons(**filtros)
+            if filtros['filtro_nome'] and not total_filtrados:
+                filtros['busca_aproximada'] = True
+                total_filtrados = contar_pokemons(**filtros)
+                if total_filtrados >= LIMITE_BUSCA_APROXIMADA:
+                    st.caption(f"Nenhum resultado exato para \"{filtros['filtro_nome']}\". "
+                               f"Mostrando os {LIMITE_BUSCA_APROXIMADA} nomes mais parecidos, do mais ao menos relevante.")
+                elif total_filtrados:
+                    st.caption(f"Nenhum resultado exato para \"{filtros['filtro_nome']}\". "
+                               "Mostrando nomes parecidos, do mais ao menos relevante.")
+            pagina = get_pagina_pokemons(**filtros, apos=paginas[-1], limite=POKEMONS_POR_PAGINA + 1,
+                                         versao_busca=st.session_state.pokedex_versao_busca)
+            tem_proxima = len(pagina) > POKEMONS_POR_PAGINA
+            pokemons_filtrados = pagina[:POKEMONS_POR_PAGINA]
+        
+            st.write(f"**Mostrando {total_filtrados} de {resumo['total_pokemons']} Pokémon**")
+        
+            total_paginas = max(1, -(-total_filtrados // POKEMONS_POR_PAGINA))
+            nav1, nav2, nav3 = st.columns([1, 2, 1])
+            with nav1:
+                if st.button("Anterior", disabled=len(paginas) == 1, use_container_width=True):
+                    paginas.pop()
+                    st.rerun()
+            with nav2:
+                st.caption(f"Página {len(paginas)} de {total_paginas}")
+            with nav3:
+                if st.button("Próxima", disabled=not tem_proxima, use_container_width=True):
+                    ultimo = pokemons_filtrados[-1]
+                    paginas.append((ultimo[9], ultimo[0]))
+                    st.rerun()
+        
+            modo_exibicao = st.radio(
+                "Exibição:",
+                ["Grade compacta", "Cartões detalhados"],
+                horizontal=True,
+                help="A grade compacta desenha a página inteira em um único elemento"
+            )
+        
+            if modo_exibicao == "Grade compacta":
+                st.html(html_grade_pokemons(pokemons_filtrados))
+            else:
+                cols = st.columns(3)
+            
+                for idx, pokemon in enumerate(pokemons_filtrados):
+                    with cols[idx % 3]:
+                        with st.container():
+                            st.markdown("---")
+                        
+                            st.subheader(f"#{pokemon[0]:03d} {pokemon[1]}")
+                        
+                            if imagem_disponivel(pokemon[4]):
+                                exibir_imagem(gerar_miniatura(pokemon[4]) or pokemon[4])
+                                if st.toggle("Ver imagem original", key=f"original_{pokemon[0]}"):
+                                    exibir_imagem(pokemon[4])
+                            else:
+                                st.warning(MENSAGENS_IMAGEM_INDISPONIVEL[pokemon[8]])
 
-elif menu == "Estatísticas":
-    st.header("Estatísticas do Sistema")
-    
-    stats = get_estatisticas()
+                            col_t1, col_t2 = st.columns(2)
+                            with col_t1:
+                                st.success(f"**{pokemon[2]}**")
+                            with col_t2:
+                                if pokemon[3]:
+                                    st.info(f"**{pokemon[3]}**")
+                        
+                            st.write(f"**Treinador:** {pokemon[5]}")
+                            st.write(f"**Cidade:** {pokemon[6]}")
+                            st.caption(f"Cadastrado em: {pokemon[7][:10]}")
+                        
+                            st.markdown("")
+        else:
+            st.info("""
+            ## Nenhum Pokémon cadastrado ainda!
+        
+            ### Para começar:
+            1. Vá para **Gerenciar Treinadores** e cadastre um treinador
+            2. Depois use **Cadastrar Pokémon** para adicionar seu primeiro Pokémon
+            3. Volte aqui para visualizar toda a Pokédex!
+        
+            Lembre-se: É necessário ter treinadores cadastrados antes de adicionar Pokémon.
+            """)
+
+    elif menu == "Estatísticas":
+        st.header("Estatísticas do Sistema")
     
-    col1, col2 = st.columns(2)
+        col1, col2 = st.columns(2)
     
-    with col1:
-        st.subheader("Métricas Principais")
-        st.metric("Total de Treinadores", stats['total_treinadores'])
-        st.metric("Total de Pokémon", stats['total_pokemons'])
-        
-        if stats['treinador_mais_pokemons']:
-            st.info(f"""
-            **Treinador Destaque:**
-            {stats['treinador_mais_pokemons'][0]}
-            com {stats['treinador_mais_pokemons'][1]} Pokémon
-            """)
+        with col1:
+            st.subheader("Métricas Principais")
+            painel_estatisticas_ao_vivo()
     
-    with col2:
-        st.subheader("Distribuição")
+        with col2:
+            st.subheader("Distribuição")
         
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT t.nome, COUNT(p.id) as total
-            FROM treinadores t
-            LEFT JOIN pokemons p ON t.id = p.treinador_id
-            GROUP BY t.id
-            ORDER BY total DESC
-        """)
-        data_treinadores = cursor.fetchall()
-        conn.close()
+            data_treinadores = get_pokemons_por_treinador(TREINADORES_NO_GRAFICO)
         
-        if data_treinadores:
-            df = pd.DataFrame(data_treinadores, columns=['Treinador', 'Pokémon'])
-            st.bar_chart(df.set_index('Treinador'))
+            if not data_treinadores.empty:
+                df = data_treinadores.set_index('nome')['total_pokemons'].rename_axis('Treinador').rename('Pokémon')
+                st.bar_chart(df)
+    
+        st.subheader("Distribuição por Tipos")
     
-    st.subheader("Distribuição por Tipos")
+        tipo_counts = get_contagem_tipos()
+        if not tipo_counts.empty:
+            col1, col2 = st.columns(2)
+            with col1:
+                st.write("**Frequência por Tipo:**")
+                st.markdown("\n".join(
+                    "- " + tipo_counts['tipo'].astype(str) + ": " + tipo_counts['total'].astype(str)
+                ))
+            with col2:
+                df_tipos = tipo_counts.set_index('tipo')['total'].rename_axis('Tipo').rename('Quantidade')
+                st.bar_chart(df_tipos)
+
+    st.markdown("---")
+    footer_col1, footer_col2, footer_col3 = st.columns(3)
+    with footer_col1:
+        st.caption("**Pokemon Company**")
+    with footer_col2:
+        st.caption("**Netendo nada**")
+    with footer_col3:
+        st.caption("**Roblox é bom**")
+    if 'init_message' not in st.session_state:
+        st.session_state.init_message = True
+        st.toast("Sistema inicializado com sucesso!")
+finally:
+    if INSTRUMENTACAO_ATIVA:
+        execucao = get_instrumentacao().finalizar_execucao(menu)
+
+if INSTRUMENTACAO_ATIVA:
+    import pandas as pd
+    
+    instrumentacao = get_instrumentacao()
     
-    pokemons = get_all_pokemons()
-    if pokemons:
-        tipos = []
-        for p in pokemons:
-            tipos.append(p[2])
-            if p[3]:
-                tipos.append(p[3])
+    with st.sidebar.expander("Depuração"):
+        st.metric("Tempo desta execução", f"{execucao['ms']:.1f} ms")
         
-        from collections import Counter
-        tipo_counts = Counter(tipos)
+        resumo_execucao = {}
+        for evento in execucao['eventos']:
+            contagem, ms = resumo_execucao.get(evento['categoria'], (0, 0.0))
+            resumo_execucao[evento['categoria']] = (contagem + 1, ms + evento['ms'])
+        st.dataframe(
+            pd.DataFrame(
+                [(categoria, contagem, round(ms, 3)) for categoria, (contagem, ms) in resumo_execucao.items()],
+                columns=['Categoria', 'Chamadas', 'ms']
+            ),
+            use_container_width=True,
+            hide_index=True
+        )
         
-        col1, col2 = st.columns(2)
-        with col1:
-            st.write("**Frequência por Tipo:**")
-            for tipo, count in tipo_counts.most_common():
-                st.write(f"- {tipo}: {count}")
-        with col2:
-            df_tipos = pd.DataFrame(list(tipo_counts.items()), columns=['Tipo', 'Quantidade'])
-            st.bar_chart(df_tipos.set_index('Tipo'))
-
-st.markdown("---")
-footer_col1, footer_col2, footer_col3 = st.columns(3)
-with footer_col1:
-    st.caption("**Pokemon Company**")
-with footer_col2:
-    st.caption("**Netendo nada**")
-with footer_col3:
-    st.caption("**Roblox é bom**")
-if 'init_message' not in st.session_state:
-    st.session_state.init_message = True
-    st.toast("Sistema inicializado com sucesso!")
+        st.caption("Operações mais lentas desde o início do processo")
+        st.dataframe(
+            pd.DataFrame(
+                [(c, r, n, round(s * 1000, 3)) for c, r, n, s in instrumentacao.totais()[:20]],
+                columns=['Categoria', 'Operação', 'Chamadas', 'ms']
+            ),
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        st.download_button(
+            "Métricas (Prometheus)",
+            data=instrumentacao.texto_prometheus,
+            file_name="pokedex_metricas.txt",
+            mime="text/plain",
+            on_click="ignore",
+            use_container_width=True
+        )
+        st.download_button(
+            "Trace (JSONL)",
+            data=instrumentacao.trace_jsonl,
+            file_name="pokedex_trace.jsonl",
+            mime="application/jsonl",
+            on_click="ignore",
+            use_container_width=True
+        )
@@ -0,0 +1,66 @@
+import os
+import runpy
+from contextlib import contextmanager
+
+import pytest
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+class ModuloApp:
+    """Dá acesso por atributo às globais do app.py executado; setattr altera as próprias globais"""
+
+    def __init__(self, globais):
+        self.__dict__ = globais
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    """Executa o app.py (sem servidor do Streamlit) em um diretório temporário com banco novo"""
+    diretorio = tmp_path_factory.mktemp("pokedex")
+    original = os.getcwd()
+    os.chdir(diretorio)
+    try:
+        # run_path devolve uma cópia; as funções enxergam o dicionário original
+        yield ModuloApp(runpy.run_path(APP)["init_database"].__globals__)
+    finally:
+        os.chdir(original)
+
+
+@pytest.fixture(scope="session")
+def treinador_id(app):
+    """Treinador com alguns Pokémon de tipos variados"""
+    app.insert_treinador("Ash", "Pallet")
+    treinador_id = app.get_treinadores_dict()["Ash - Pallet"]
+    for nome, tipo1, tipo2 in [("Pikachu", "Elétrico", None), ("Charizard", "Fogo", "Voador"),
+                               ("Bulbasaur", "Planta", "Veneno"), ("Squirtle", "Água", None)]:
+        app.insert_pokemon(nome, tipo1, tipo2, treinador_id, None)
+    return treinador_id
+
+
+@contextmanager
+def capturar_sql(app):
+    """Coleta, já com os parâmetros aplicados, os comandos executados pelas conexões do pool"""
+    pool = app.get_pool()
+    conexoes = list(pool._leitores.queue) + [pool._escritor]
+    comandos = []
+    for conn in conexoes:
+        conn.set_trace_callback(comandos.append)
+    try:
+        yield comandos
+    finally:
+        for conn in conexoes:
+            conn.set_trace_callback(None)
+
+
+def plano_consulta(app, funcao, *args, **kwargs):
+    """Executa `funcao` sem cache e retorna o EXPLAIN QUERY PLAN de cada SELECT que ela fez"""
+    app.st.cache_data.clear()
+    with capturar_sql(app) as comandos:
+        funcao(*args, **kwargs)
+    planos = []
+    with app.conexao_leitura() as conn:
+        for sql in comandos:
+            if sql.lstrip().upper().startswith("SELECT"):
+                planos.append([linha[3] for linha in conn.execute(f"EXPLAIN QUERY PLAN {sql}")])
+    return planos
@@ -0,0 +1,72 @@
+import pytest
+
+pytest.importorskip("boto3")
+from botocore.stub import Stubber
+
+
+@pytest.fixture
+def s3(app, monkeypatch):
+    """ArmazenamentoS3 com o cliente interceptado pelo Stubber do botocore"""
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "teste")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "teste")
+    armazenamento = app.ArmazenamentoS3("pokedex", "imagens", url_publica="https://cdn.exemplo/pokedex")
+    with Stubber(armazenamento.cliente) as stubber:
+        yield armazenamento, stubber
+        stubber.assert_no_pending_responses()
+
+
+@pytest.fixture
+def miniatura(app, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    caminho = tmp_path / "static" / "miniaturas" / "abc_320x320.webp"
+    caminho.parent.mkdir(parents=True)
+    caminho.write_bytes(b"RIFF0000WEBP")
+    return "static/miniaturas/abc_320x320.webp"
+
+
+CHAVE = "imagens/static/miniaturas/abc_320x320.webp"
+
+
+def test_url_nao_consulta_o_bucket(s3, miniatura):
+    armazenamento, _ = s3
+    # Sem respostas enfileiradas, qualquer chamada ao cliente falharia
+    assert armazenamento.url(miniatura) == f"https://cdn.exemplo/pokedex/{CHAVE}"
+
+
+def test_envia_quando_a_chave_nao_existe(app, s3, miniatura):
+    armazenamento, stubber = s3
+    stubber.add_client_error("head_object", service_error_code="404", http_status_code=404,
+                             expected_params={"Bucket": "pokedex", "Key": CHAVE})
+    # O s3transfer acrescenta parâmetros próprios (como ChecksumAlgorithm), então o envio é conferido à parte
+    envios = []
+    armazenamento.cliente.meta.events.register("provide-client-params.s3.PutObject",
+                                               lambda params, **_: envios.append(dict(params)))
+    stubber.add_response("put_object", {})
+
+    assert armazenamento.publicar(miniatura)
+    assert len(envios) == 1
+    assert envios[0]["Bucket"] == "pokedex"
+    assert envios[0]["Key"] == CHAVE
+    assert envios[0]["ContentType"] == "image/webp"
+    assert envios[0]["CacheControl"] == app.CACHE_CONTROL_IMAGENS
+    # Já publicada neste processo: não consulta o bucket de novo
+    assert armazenamento.publicar(miniatura)
+
+
+def test_nao_reenvia_o_que_ja_esta_no_bucket(s3, miniatura):
+    armazenamento, stubber = s3
+    stubber.add_response("head_object", {}, {"Bucket": "pokedex", "Key": CHAVE})
+
+    assert armazenamento.publicar(miniatura)
+
+
+def test_erro_do_bucket_e_informado(s3, miniatura):
+    armazenamento, stubber = s3
+    stubber.add_client_error("head_object", service_error_code="403", http_status_code=403,
+                             expected_params={"Bucket": "pokedex", "Key": CHAVE})
+
+    assert not armazenamento.publicar(miniatura)
+    # A falha não fica memorizada como publicada: o próximo publicar-imagens tenta de novo
+    stubber.add_response("head_object", {}, {"Bucket": "pokedex", "Key": CHAVE})
+    assert armazenamento.publicar(miniatura)
@@ -0,0 +1,51 @@
+import pytest
+
+
+@pytest.fixture(scope="module")
+def zubats(app, treinador_id):
+    """Pokémon cujo nome repete o termo buscado em quantidades diferentes"""
+    for nome in ["Zubat Alfa", "Zubat Zubat Zubat", "Zubat Beta", "Zubat Zubat", "Zubat Gama"]:
+        app.insert_pokemon(nome, "Veneno", "Voador", treinador_id, None)
+    app.st.cache_data.clear()
+
+
+def _percorrer(app, limite, **filtros):
+    """Lê todas as páginas seguindo a chave (ordem, id) da última linha de cada uma"""
+    linhas, apos = [], None
+    while True:
+        pagina = app.get_pagina_pokemons(**filtros, apos=apos, limite=limite)
+        linhas.extend(pagina)
+        if len(pagina) < limite:
+            return linhas
+        apos = (pagina[-1][9], pagina[-1][0])
+
+
+def test_busca_textual_ordena_por_relevancia(app, zubats):
+    linhas = app.get_pagina_pokemons(filtro_nome="zubat", limite=10)
+    assert [linha[1] for linha in linhas[:2]] == ["Zubat Zubat Zubat", "Zubat Zubat"]
+    assert [(linha[9], linha[0]) for linha in linhas] == sorted((linha[9], linha[0]) for linha in linhas)
+
+
+@pytest.mark.parametrize("filtros", [{"filtro_nome": "zubat"},
+                                     {"filtro_nome": "zubta", "busca_aproximada": True}])
+def test_paginas_da_busca_seguem_a_relevancia(app, zubats, filtros):
+    completa = app.get_pagina_pokemons(**filtros, limite=1000)
+    assert completa
+    assert len(completa) == app.contar_pokemons(**filtros)
+    assert _percorrer(app, 2, **filtros) == completa
+
+
+def test_paginas_da_busca_sobrevivem_a_insercoes(app, treinador_id):
+    for i in range(10):
+        app.insert_pokemon(f"Golbat {i}", "Veneno", "Voador", treinador_id, None)
+        app.insert_pokemon(f"Outro {i}", "Normal", None, treinador_id, None)
+
+    versao = app.versao_dados()
+    primeira = app.get_pagina_pokemons(filtro_nome="golbat", limite=5, versao_busca=versao)
+    for i in range(30):
+        app.insert_pokemon(f"Intruso {i}", "Normal", None, treinador_id, None)
+    segunda = app.get_pagina_pokemons(filtro_nome="golbat", limite=5, versao_busca=versao,
+                                      apos=(primeira[-1][9], primeira[-1][0]))
+
+    assert len(primeira) == len(segunda) == 5
+    assert sorted(linha[1] for linha in primeira + segunda) == [f"Golbat {i}" for i in range(10)]
@@ -0,0 +1,59 @@
+def _estatisticas(conn):
+    """Estatísticas materializadas pelos triggers"""
+    return (
+        conn.execute("SELECT total_treinadores, total_pokemons, com_dois_tipos FROM estatisticas_gerais").fetchone(),
+        conn.execute("SELECT treinador_id, total_pokemons FROM estatisticas_treinadores ORDER BY 1").fetchall(),
+        conn.execute("SELECT tipo_id, total FROM estatisticas_tipos ORDER BY 1").fetchall(),
+    )
+
+
+def _recalculadas(conn):
+    """As mesmas estatísticas calculadas do zero com GROUP BY"""
+    return (
+        conn.execute("""
+            SELECT (SELECT COUNT(*) FROM treinadores), COUNT(*), COUNT(tipo2_id) FROM pokemons
+        """).fetchone(),
+        conn.execute("""
+            SELECT t.id, COUNT(p.id) FROM treinadores t
+            LEFT JOIN pokemons p ON p.treinador_id = t.id
+            GROUP BY t.id ORDER BY 1
+        """).fetchall(),
+        conn.execute("""
+            SELECT tipo_id, COUNT(*)
+            FROM (SELECT tipo1_id AS tipo_id FROM pokemons
+                  UNION ALL
+                  SELECT tipo2_id FROM pokemons WHERE tipo2_id IS NOT NULL)
+            GROUP BY tipo_id ORDER BY 1
+        """).fetchall(),
+    )
+
+
+def _conferir(app):
+    with app.conexao_leitura() as conn:
+        assert _estatisticas(conn) == _recalculadas(conn)
+
+
+def test_triggers_mantem_as_estatisticas(app, treinador_id):
+    app.insert_treinador("Misty", "Cerulean")
+    misty = app.get_treinadores_dict()["Misty - Cerulean"]
+    app.insert_pokemon("Staryu", "Água", None, misty, None)
+    app.insert_pokemon("Starmie", "Água", "Psíquico", misty, None)
+    _conferir(app)
+
+    with app.conexao_escrita() as conn:
+        app.registrar_tipos(conn, ["Gelo", "Fada"])
+        tipo = dict(conn.execute("SELECT nome, id FROM tipos").fetchall())
+        # Troca de tipos (incluindo ganhar e perder o secundário) e de treinador
+        conn.execute("UPDATE pokemons SET tipo1_id = ?, tipo2_id = ? WHERE nome = 'Staryu'",
+                     (tipo["Gelo"], tipo["Fada"]))
+        conn.execute("UPDATE pokemons SET tipo2_id = NULL, treinador_id = ? WHERE nome = 'Starmie'",
+                     (treinador_id,))
+    _conferir(app)
+
+    with app.conexao_escrita() as conn:
+        conn.execute("DELETE FROM pokemons WHERE nome IN ('Staryu', 'Starmie')")
+        conn.execute("DELETE FROM treinadores WHERE id = ?", (misty,))
+    _conferir(app)
+    with app.conexao_leitura() as conn:
+        # Tipos que ficaram sem Pokémon saem da tabela em vez de ficar com total zero
+        assert conn.execute("SELECT COUNT(*) FROM estatisticas_tipos WHERE total <= 0").fetchone() == (0,)
@@ -0,0 +1,16 @@
+import io
+import zipfile
+
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+
+@pytest.mark.parametrize("formato", ["csv", "jsonl", "zip"])
+def test_exportacao_download_e_aceita_pelo_download_button(app, treinador_id, formato):
+    dados, _ = convert_data_to_bytes_and_infer_mime(app.gerar_exportacao_download(formato),
+                                                    TypeError("tipo não suportado"))
+    if formato == "zip":
+        with zipfile.ZipFile(io.BytesIO(dados)) as arquivo_zip:
+            assert arquivo_zip.testzip() is None
+    else:
+        assert "Pikachu" in dados.decode("utf-8")
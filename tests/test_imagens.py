@@ -0,0 +1,154 @@
+import io
+import os
+import time
+
+from PIL import Image
+
+
+def _png(cor):
+    saida = io.BytesIO()
+    Image.new("RGB", (8, 8), cor).save(saida, "PNG")
+    return saida.getvalue()
+
+
+def _png_corrompido():
+    """PNG com o checksum do IDAT errado: o `verify()` do Pillow levanta SyntaxError"""
+    conteudo = bytearray(_png("red"))
+    conteudo[conteudo.index(b"IDAT") + 6] ^= 0xFF
+    return bytes(conteudo)
+
+
+def _envelhecer(caminho):
+    os.utime(caminho, (0, 0))
+
+
+def test_coleta_remove_copias_antigas_e_objetos_orfaos(app, treinador_id):
+    antigo = os.path.join(app.UPLOADS_DIR, "20240101_000000_000000_antigo.png")
+    with open(antigo, "wb") as arquivo:
+        arquivo.write(_png("red"))
+
+    # Simula a migração: o Pokémon passa a apontar para a cópia no armazenamento por conteúdo
+    with open(antigo, "rb") as arquivo:
+        referenciado = app.armazenar_conteudo(arquivo, antigo)
+    app.insert_pokemon("Vulpix", "Fogo", None, treinador_id, referenciado)
+    miniatura_referenciada = app.gerar_miniatura(referenciado)
+
+    orfao = app.armazenar_conteudo(io.BytesIO(_png("blue")), "orfao.png")
+    miniatura_orfa = app.gerar_miniatura(orfao)
+
+    for caminho in (antigo, referenciado, orfao):
+        _envelhecer(caminho)
+
+    assert app.coletar_imagens_orfas() == 2
+    assert not os.path.exists(antigo)
+    assert not os.path.exists(orfao)
+    assert not os.path.exists(miniatura_orfa)
+    assert os.path.exists(referenciado)
+    assert os.path.exists(miniatura_referenciada)
+
+
+def test_coleta_respeita_o_prazo(app):
+    recente = app.armazenar_conteudo(io.BytesIO(_png("green")), "recente.png")
+    app.coletar_imagens_orfas()
+    assert os.path.exists(recente)
+
+
+def test_imagem_corrompida_marca_erro(app, treinador_id):
+    sucesso, _ = app.insert_pokemon("Ditto", "Normal", None, treinador_id, None)
+    assert sucesso
+    with app.conexao_leitura() as conn:
+        pokemon_id, = conn.execute("SELECT id FROM pokemons WHERE nome = 'Ditto'").fetchone()
+
+    pendente = app.caminho_pendente(pokemon_id, "ditto.png")
+    with open(pendente, "wb") as arquivo:
+        arquivo.write(_png_corrompido())
+
+    app.processar_imagem_pokemon(pokemon_id, pendente)
+
+    with app.conexao_leitura() as conn:
+        linha = conn.execute("SELECT imagem_path, imagem_status FROM pokemons WHERE id = ?", (pokemon_id,)).fetchone()
+    assert linha == (None, app.IMAGEM_ERRO)
+    assert not os.path.exists(pendente)
+
+
+def _status(app, pokemon_id):
+    with app.conexao_leitura() as conn:
+        return conn.execute("SELECT imagem_status FROM pokemons WHERE id = ?", (pokemon_id,)).fetchone()[0]
+
+
+def test_imagens_pendentes_sao_retomadas_na_inicializacao(app, treinador_id):
+    """Simula um processo que parou com duas imagens na fila e um envio sem Pokémon"""
+    ids = []
+    with app.conexao_escrita() as conn:
+        for nome in ("Porygon", "Porygon2"):
+            cursor = conn.execute(
+                f"INSERT INTO pokemons (nome, tipo1_id, treinador_id, imagem_status) "
+                f"VALUES (?, {app.SQL_ID_TIPO}, ?, ?)",
+                (nome, "Normal", treinador_id, app.IMAGEM_PROCESSANDO)
+            )
+            ids.append(cursor.lastrowid)
+    com_envio, sem_envio = ids
+    with open(app.caminho_pendente(com_envio, "porygon.png"), "wb") as arquivo:
+        arquivo.write(_png("cyan"))
+    sobra = app.caminho_pendente(999999, "sobra.png")
+    with open(sobra, "wb") as arquivo:
+        arquivo.write(_png("gray"))
+
+    assert app.retomar_imagens_pendentes() == 1
+    assert _status(app, sem_envio) == app.IMAGEM_ERRO
+    assert not os.path.exists(sobra)
+
+    prazo = time.monotonic() + 10
+    while _status(app, com_envio) == app.IMAGEM_PROCESSANDO and time.monotonic() < prazo:
+        time.sleep(0.05)
+    assert _status(app, com_envio) == app.IMAGEM_PRONTA
+    assert os.listdir(app.PENDENTES_DIR) == []
+
+
+class _Envio(io.BytesIO):
+    """Imita o UploadedFile do Streamlit: conteúdo em `getvalue()` e nome do arquivo"""
+
+    def __init__(self, nome, conteudo):
+        super().__init__(conteudo)
+        self.name = nome
+
+
+def test_equipe_com_imagem_corrompida_aponta_a_linha(app, treinador_id):
+    linhas = [{"nome": "Mew", "tipo1": "Psíquico"}, {"nome": "Mewtwo", "tipo1": "Psíquico"}]
+    arquivos = [_Envio("mew.png", _png("pink")), _Envio("mewtwo.png", _png_corrompido())]
+
+    sucesso, _, erros = app.cadastrar_equipe(treinador_id, linhas, arquivos)
+
+    assert not sucesso
+    assert [numero for numero, _ in erros] == [2]
+    assert erros[0][1].startswith("Imagem inválida (mewtwo.png)")
+    with app.conexao_leitura() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM pokemons WHERE nome LIKE 'Mew%'").fetchone() == (0,)
+
+
+def test_coleta_pela_linha_de_comando(app, capsys):
+    orfao = app.armazenar_conteudo(io.BytesIO(_png("purple")), "orfao_cli.png")
+    _envelhecer(orfao)
+
+    assert app.executar_cli(["coletar-imagens"]) == 0
+    assert not os.path.exists(orfao)
+    assert "imagens órfãs removidas" in capsys.readouterr().out
+
+
+def test_cadastro_com_imagem_grava_o_envio_antes_de_processar(app, treinador_id):
+    sucesso, _ = app.cadastrar_pokemon_com_imagem("Togepi", "Fada", None, treinador_id,
+                                                  _Envio("togepi.png", _png("white")))
+    assert sucesso
+    with app.conexao_leitura() as conn:
+        pokemon_id, = conn.execute("SELECT id FROM pokemons WHERE nome = 'Togepi'").fetchone()
+
+    prazo = time.monotonic() + 10
+    while _status(app, pokemon_id) == app.IMAGEM_PROCESSANDO and time.monotonic() < prazo:
+        time.sleep(0.05)
+    assert _status(app, pokemon_id) == app.IMAGEM_PRONTA
+    assert not os.path.exists(app.caminho_pendente(pokemon_id, "togepi.png"))
+
+
+def test_publicacao_pela_linha_de_comando(app, capsys):
+    assert app.executar_cli(["publicar-imagens"]) == 0
+    assert ", 0 falhas" in capsys.readouterr().out
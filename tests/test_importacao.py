@@ -0,0 +1,51 @@
+from PIL import Image
+
+
+def _registros(treinador_id, imagem):
+    return [(2, {"nome": "Eevee", "tipo1": "Normal", "treinador": str(treinador_id), "imagem": imagem})]
+
+
+def test_importacao_sem_diretorio_recusa_imagens(app, treinador_id):
+    relatorio = app.importar_registros(_registros(treinador_id, "/etc/passwd"), "pokemons")
+    assert relatorio['inseridos'] == 0
+    assert relatorio['rejeitados'] == [(2, "Imagens não são aceitas nesta importação")]
+
+
+def test_importacao_nao_sai_do_diretorio_de_imagens(app, treinador_id, tmp_path):
+    for imagem in ("/etc/passwd", "../../../../etc/passwd"):
+        relatorio = app.importar_registros(_registros(treinador_id, imagem), "pokemons",
+                                           diretorio_imagens=tmp_path)
+        assert relatorio['inseridos'] == 0
+        assert relatorio['rejeitados'][0][1].startswith("Imagem fora do diretório de importação")
+
+
+def test_importacao_valida_o_conteudo_da_imagem(app, treinador_id, tmp_path):
+    (tmp_path / "texto.png").write_text("não é uma imagem")
+    Image.new("RGB", (8, 8), "yellow").save(tmp_path / "eevee.png")
+
+    relatorio = app.importar_registros(_registros(treinador_id, "texto.png"), "pokemons",
+                                       diretorio_imagens=tmp_path)
+    assert relatorio['inseridos'] == 0
+    assert relatorio['rejeitados'][0][1].startswith("Imagem inválida (texto.png)")
+
+    relatorio = app.importar_registros(_registros(treinador_id, "eevee.png"), "pokemons",
+                                       diretorio_imagens=tmp_path)
+    assert relatorio['inseridos'] == 1
+    with app.conexao_leitura() as conn:
+        imagem_path, = conn.execute("SELECT imagem_path FROM pokemons WHERE nome = 'Eevee'").fetchone()
+    assert imagem_path.startswith(app.OBJETOS_DIR)
+
+
+def test_nome_de_treinador_repetido_e_ambiguo(app):
+    app.insert_treinador("Brock", "Pewter")
+    app.insert_treinador("Brock", "Cerulean")
+    registro = {"nome": "Onix", "tipo1": "Pedra"}
+
+    relatorio = app.importar_registros([(2, {**registro, "treinador": "Brock"})], "pokemons")
+    assert relatorio['inseridos'] == 0
+    assert relatorio['rejeitados'] == [
+        (2, 'Há mais de um treinador chamado Brock; use "nome - cidade" ou o id')
+    ]
+
+    relatorio = app.importar_registros([(2, {**registro, "treinador": "Brock - Pewter"})], "pokemons")
+    assert relatorio['inseridos'] == 1
@@ -0,0 +1,97 @@
+import sqlite3
+
+import pytest
+
+VERSAO_ANTES_DO_CATALOGO = 5
+
+POKEMONS = [
+    ("Pikachu", "Elétrico", None, "Ash"),
+    ("Charizard", "Fogo", "Voador", "Ash"),
+    ("Vulpix", "Fogo", None, "Brock"),
+    ("Apagado", "Normal", None, "Brock"),
+    ("Onix", "Pedra", "Terrestre", "Brock"),
+]
+
+
+@pytest.fixture
+def banco_v5(app, tmp_path, monkeypatch):
+    """Banco com dados na versão 5, com tipos ainda em texto, e o id mais alto já apagado"""
+    conn = sqlite3.connect(tmp_path / "v5.db")
+    conn.execute("PRAGMA foreign_keys=ON")
+    with monkeypatch.context() as contexto:
+        contexto.setattr(app, "MIGRACOES", app.MIGRACOES[:VERSAO_ANTES_DO_CATALOGO])
+        app._criar_tabelas(conn)
+
+    treinadores = {}
+    for nome, cidade in (("Ash", "Pallet"), ("Brock", "Pewter")):
+        treinadores[nome] = conn.execute("INSERT INTO treinadores (nome, cidade) VALUES (?, ?)", (nome, cidade)).lastrowid
+    for nome, tipo1, tipo2, treinador in POKEMONS:
+        conn.execute("INSERT INTO pokemons (nome, tipo1, tipo2, treinador_id) VALUES (?, ?, ?, ?)",
+                     (nome, tipo1, tipo2, treinadores[treinador]))
+    conn.execute("DELETE FROM pokemons WHERE nome = 'Apagado'")
+    conn.execute("DELETE FROM pokemons WHERE nome = 'Onix'")
+    conn.execute("INSERT INTO pokemons (nome, tipo1, tipo2, treinador_id, imagem_status) VALUES (?, ?, ?, ?, ?)",
+                 ("Onix", "Pedra", "Terrestre", treinadores["Brock"], app.IMAGEM_ERRO))
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def _pokemons(conn, colunas_tipo):
+    return conn.execute(f"""
+        SELECT p.id, p.nome, {colunas_tipo}, p.treinador_id, p.imagem_path, p.data_cadastro, p.imagem_status
+        FROM pokemons p ORDER BY p.id
+    """).fetchall()
+
+
+def test_catalogo_de_tipos_preserva_os_dados(app, banco_v5):
+    conn = banco_v5
+    assert conn.execute("PRAGMA user_version").fetchone() == (VERSAO_ANTES_DO_CATALOGO,)
+    antes = _pokemons(conn, "p.tipo1, p.tipo2")
+    sequencia = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'pokemons'").fetchone()
+
+    app.aplicar_migracoes(conn)
+
+    assert conn.execute("PRAGMA user_version").fetchone() == (len(app.MIGRACOES),)
+    assert _pokemons(conn, """
+        (SELECT nome FROM tipos WHERE id = p.tipo1_id), (SELECT nome FROM tipos WHERE id = p.tipo2_id)
+    """) == antes
+    # O AUTOINCREMENT continua de onde parou: ids apagados não são reutilizados
+    assert conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'pokemons'").fetchone() == sequencia
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_sequence WHERE name = 'pokemons_nova'").fetchone() == (0,)
+
+    assert dict(conn.execute("""
+        SELECT t.nome, e.total FROM estatisticas_tipos e JOIN tipos t ON t.id = e.tipo_id
+    """).fetchall()) == {"Elétrico": 1, "Fogo": 2, "Voador": 1, "Pedra": 1, "Terrestre": 1}
+
+    assert conn.execute("""
+        SELECT rowid, nome, tipo1, tipo2, treinador_nome, treinador_cidade FROM busca_pokemons ORDER BY rowid
+    """).fetchall() == conn.execute("""
+        SELECT p.id, p.nome, t1.nome, t2.nome, t.nome, t.cidade
+        FROM pokemons p
+        JOIN treinadores t ON t.id = p.treinador_id
+        JOIN tipos t1 ON t1.id = p.tipo1_id
+        LEFT JOIN tipos t2 ON t2.id = p.tipo2_id
+        ORDER BY p.id
+    """).fetchall()
+    assert conn.execute("SELECT rowid, nome FROM busca_pokemons_trigram ORDER BY rowid").fetchall() == \
+        conn.execute("SELECT id, nome FROM pokemons ORDER BY id").fetchall()
+
+
+def test_triggers_recriados_funcionam_apos_o_catalogo(app, banco_v5):
+    conn = banco_v5
+    app.aplicar_migracoes(conn)
+
+    app.registrar_tipos(conn, ["Fogo"])
+    cursor = conn.execute(
+        f"INSERT INTO pokemons (nome, tipo1_id, treinador_id) VALUES (?, {app.SQL_ID_TIPO}, 1)", ("Growlithe", "Fogo")
+    )
+    conn.commit()
+
+    ultimo_id = conn.execute("SELECT MAX(id) FROM pokemons").fetchone()[0]
+    assert cursor.lastrowid == ultimo_id
+    assert conn.execute("""
+        SELECT e.total FROM estatisticas_tipos e JOIN tipos t ON t.id = e.tipo_id WHERE t.nome = 'Fogo'
+    """).fetchone() == (3,)
+    assert conn.execute("SELECT rowid FROM busca_pokemons WHERE busca_pokemons MATCH 'growlithe'").fetchall() == \
+        [(ultimo_id,)]
@@ -0,0 +1,56 @@
+from conftest import plano_consulta
+
+
+def _sem_ordenacao_extra(plano):
+    return not any("TEMP B-TREE" in linha for linha in plano)
+
+
+def test_migracoes_aplicadas(app):
+    with app.conexao_leitura() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == len(app.MIGRACOES)
+
+
+def test_join_com_treinadores_usa_chave_primaria(app, treinador_id):
+    [plano] = plano_consulta(app, app.get_pagina_pokemons)
+    assert "SEARCH t USING INTEGER PRIMARY KEY (rowid=?)" in plano
+
+
+def test_pagina_ordenada_por_nome_percorre_indice(app, treinador_id):
+    [plano] = plano_consulta(app, app.get_pagina_pokemons)
+    assert "SCAN p USING INDEX idx_pokemons_nome" in plano
+    assert _sem_ordenacao_extra(plano)
+
+
+def test_pagina_seguinte_busca_pela_chave(app, treinador_id):
+    [plano] = plano_consulta(app, app.get_pagina_pokemons, apos=("Charizard", 2))
+    assert "SEARCH p USING INDEX idx_pokemons_nome (nome>?)" in plano
+    assert _sem_ordenacao_extra(plano)
+
+
+def test_filtro_por_tipo_usa_os_dois_indices(app, treinador_id):
+    tipo_id = app.get_tipos_cadastrados()[0]
+    for funcao in (app.get_pagina_pokemons, app.contar_pokemons):
+        [plano] = plano_consulta(app, funcao, filtro_tipo=tipo_id)
+        assert "MULTI-INDEX OR" in plano
+        assert "SEARCH p USING INDEX idx_pokemons_tipo1_id (tipo1_id=?)" in plano
+        assert "SEARCH p USING INDEX idx_pokemons_tipo2_id (tipo2_id=?)" in plano
+
+
+def test_pokemons_do_treinador_vem_ordenados_pelo_indice(app, treinador_id):
+    [plano] = plano_consulta(app, app.get_pagina_pokemons, filtro_treinador_id=treinador_id)
+    assert "SEARCH p USING INDEX idx_pokemons_treinador_nome (treinador_id=?)" in plano
+    assert _sem_ordenacao_extra(plano)
+
+    [plano] = plano_consulta(app, app.contar_pokemons, filtro_treinador_id=treinador_id)
+    assert "SEARCH p USING COVERING INDEX idx_pokemons_treinador_nome (treinador_id=?)" in plano
+
+
+def test_contagens_por_treinador_leem_estatisticas_materializadas(app, treinador_id):
+    planos = plano_consulta(app, app.get_estatisticas)
+    assert all("pokemons" not in linha for plano in planos for linha in plano)
+    assert "SCAN e USING COVERING INDEX idx_estatisticas_treinadores_ranking" in planos[1]
+
+
+def test_retomada_de_imagens_le_o_indice_parcial(app):
+    [plano] = plano_consulta(app, app.retomar_imagens_pendentes)
+    assert "SCAN pokemons USING INDEX idx_pokemons_processando" in plano